@@ -0,0 +1,80 @@
+import os
+import argparse
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+
+from .timing import measure, summarize
+
+
+def load_puzzle(app: QApplication, board) -> None:
+    statuses = []
+    board.board_status_signal.connect(statuses.append)
+    board.initialize_puzzle()
+    while not statuses:
+        app.processEvents()
+    board.board_status_signal.disconnect(statuses.append)
+    board.repaint()
+
+
+def benchmark_board(app: QApplication, board_class, repeat: int) -> None:
+    from data_managers import DataAccessWorker
+    data_access = DataAccessWorker()
+    board = board_class(data_access)
+    board.resize(760, 760)
+    board.show()
+    board_controller = board.board_controller
+    for _ in range(20):
+        load_puzzle(app, board)
+
+    load_timings = measure(lambda: load_puzzle(app, board), repeat)
+
+    sizes = iter(range(repeat))
+    def resize() -> None:
+        size = 740 + next(sizes) % 20 * 8
+        board.resize(size, size)
+        app.processEvents()
+    resize_timings = measure(resize, repeat)
+
+    piece = next(piece for piece in board_controller.piece_squares if piece)
+    home_square = piece.square
+    empty_square = next(
+        f'{file}{rank}' for file in 'abcdefgh' for rank in '3456'
+        if board_controller.get_piece_at(f'{file}{rank}') is None
+    )
+    targets = iter(range(repeat))
+    def move_piece() -> None:
+        square = empty_square if next(targets) % 2 == 0 else home_square
+        board.place_piece(piece, *board_controller.get_board_square_indexes(square))
+        piece.square = square
+        app.processEvents()
+    move_timings = measure(move_piece, repeat)
+
+    frame_timings = measure(board.grab, repeat)
+
+    data_access.shutdown()
+    board.close()
+    print(board_class.__name__)
+    print(f'  puzzle load + paint: {summarize(load_timings)}')
+    print(f'  resize:              {summarize(resize_timings)}')
+    print(f'  piece move:          {summarize(move_timings)}')
+    print(f'  full frame:          {summarize(frame_timings)}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.board_rendering',
+        description='Compare the widget board with the painted board offscreen.'
+    )
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    from board import ChessBoard, PaintedChessBoard
+    for board_class in (ChessBoard, PaintedChessBoard):
+        benchmark_board(app, board_class, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import os
+import csv
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+from data_managers import PuzzleImporter, PuzzleManager
+from data_managers.__main__ import DEFAULT_DB_PATH
+from .timing import measure, summarize
+
+
+def write_sample_csv(source_path: str, csv_path: str, count: int) -> None:
+    with sqlite3.connect(f'file:{source_path}?mode=ro', uri=True) as connection:
+        rows = connection.execute(
+            'SELECT puzzle_id, fen, moves, rating, rating_deviation, themes '
+            'FROM puzzle_info JOIN puzzle_moves USING (puzzle_id) '
+            'ORDER BY puzzle_id LIMIT ?', (count,)
+        ).fetchall()
+    with open(csv_path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        for index in range(count):
+            puzzle_id, fen, moves, rating, rating_deviation, themes = (
+                rows[index % len(rows)]
+            )
+            writer.writerow((
+                f'{puzzle_id}-{index // len(rows)}', fen, moves, rating,
+                rating_deviation, 90, 100, themes, '', ''
+            ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.draw_latency',
+        description=(
+            'Time random puzzle draws on databases of increasing size, built '
+            'from puzzles sampled out of an existing database.'
+        )
+    )
+    parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 16000, 64000]
+    )
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp(prefix='draw_latency_')
+    try:
+        for count in args.sizes:
+            csv_path = os.path.join(temp_dir, f'puzzles_{count}.csv')
+            db_path = os.path.join(temp_dir, f'puzzles_{count}.db')
+            write_sample_csv(args.db_path, csv_path, count)
+            PuzzleImporter(db_path).import_csv(csv_path)
+
+            manager = PuzzleManager(db_path)
+            theme = manager.get_puzzle_themes()[0]
+            for name, filters in (
+                ('unfiltered', ()),
+                ('rating', (1000, 2000)),
+                ('rating + theme', (1000, 2000, theme)),
+                ('rating + theme + side + length', (1000, 2000, theme, 'w', 2)),
+            ):
+                manager.get_puzzle(*filters)
+                timings = measure(lambda: manager.get_puzzle(*filters), args.repeat)
+                print(
+                    f'{count} puzzles, {name}: '
+                    f'{summarize([timing * 1000 for timing in timings], "us")}'
+                )
+            manager.session.close()
+            manager.engine.dispose()
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from functools import partial
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QMessageBox
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from data_managers import PuzzleManager, UserDataManager, data_access_worker
+from data_managers.__main__ import DEFAULT_DB_PATH
+from .timing import summarize
+
+
+USERS_DB_PATH = os.path.join(os.path.dirname(DEFAULT_DB_PATH), 'users_db.db')
+
+
+def time_main_thread_calls(function, timings):
+    def timed(*args, **kwargs):
+        if threading.current_thread() is not threading.main_thread():
+            return function(*args, **kwargs)
+        start_time = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings.append((time.perf_counter() - start_time) * 1000)
+    return timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.main_thread_stall',
+        description=(
+            'Play puzzles in the full window and measure how long the GUI '
+            'thread stalls and how much database work runs on it.'
+        )
+    )
+    parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    parser.add_argument('--puzzles', type=int, default=40)
+    args = parser.parse_args()
+
+    database_timings = []
+    Session.execute = time_main_thread_calls(Session.execute, database_timings)
+    Session.commit = time_main_thread_calls(Session.commit, database_timings)
+    Connection.execute = time_main_thread_calls(Connection.execute, database_timings)
+    QMessageBox.exec = lambda self: QMessageBox.StandardButton.Yes
+
+    temp_dir = tempfile.mkdtemp()
+    users_db_path = os.path.join(temp_dir, 'users_db.db')
+    shutil.copyfile(USERS_DB_PATH, users_db_path)
+    data_access_worker.PuzzleManager = partial(PuzzleManager, args.db_path)
+    data_access_worker.UserDataManager = partial(UserDataManager, users_db_path)
+
+    from ui import Application, MainWindow
+    app = Application()
+    window = MainWindow()
+    ui_controller = window.ui_controller
+    board_controller = window.puzzles_window.board_widget.board_controller
+
+    def play_move() -> None:
+        if not board_controller.is_board_active:
+            return
+        session = board_controller.session
+        move = session.moves[session.current_move]
+        board_controller.select_promotion_piece = (
+            lambda color, piece_style, promotion=move[4:]: promotion
+        )
+        board_controller.handle_player_move(
+            board_controller.get_piece_at(move[:2]), square=move[2:4]
+        )
+
+    actions = []
+    for index in range(args.puzzles):
+        actions.append(ui_controller.initialize_puzzle)
+        actions += [play_move] * 4
+        if index == args.puzzles // 2:
+            actions += [
+                ui_controller.show_statistics_window,
+                ui_controller.save_settings,
+                ui_controller.reset_progress
+            ]
+
+    gaps = []
+    last_beat = [time.perf_counter()]
+    def beat() -> None:
+        now = time.perf_counter()
+        gaps.append((now - last_beat[0]) * 1000)
+        last_beat[0] = now
+
+    def step() -> None:
+        if actions:
+            actions.pop(0)()
+            QTimer.singleShot(20, step)
+        else:
+            QTimer.singleShot(300, app.quit)
+
+    def start() -> None:
+        gaps.clear()
+        database_timings.clear()
+        last_beat[0] = time.perf_counter()
+        step()
+
+    heartbeat = QTimer()
+    heartbeat.timeout.connect(beat)
+    heartbeat.start(2)
+    QTimer.singleShot(500, start)
+    app.exec()
+    shutil.rmtree(temp_dir)
+
+    print(f'heartbeat gaps: {summarize(gaps)}, max {max(gaps):.1f} ms')
+    print(
+        f'GUI-thread database calls: {len(database_timings)}, '
+        f'total {sum(database_timings):.1f} ms'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import sqlite3
+import argparse
+
+import chess
+
+from data_managers import PuzzleCodec
+from data_managers.__main__ import DEFAULT_DB_PATH
+from .timing import measure, summarize
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.puzzle_decoding',
+        description=(
+            'Compare loading puzzles from the packed encoding with parsing '
+            'their FEN and move text.'
+        )
+    )
+    parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    parser.add_argument('--puzzles', type=int, default=20000)
+    args = parser.parse_args()
+
+    with sqlite3.connect(f'file:{args.db_path}?mode=ro', uri=True) as connection:
+        rows = connection.execute(
+            'SELECT fen, moves FROM puzzle_moves LIMIT ?', (args.puzzles,)
+        ).fetchall()
+    codec = PuzzleCodec()
+    packed = [codec.encode(fen, moves) for fen, moves in rows]
+
+    fen_rows = iter(rows * 2)
+    def parse_fen() -> None:
+        fen, moves = next(fen_rows)
+        chess.Board(fen), moves.split()
+    packed_rows = iter(packed * 2)
+    def decode_packed() -> None:
+        codec.decode(next(packed_rows))
+
+    fen_timings = [timing * 1000 for timing in measure(parse_fen, len(rows))]
+    packed_timings = [timing * 1000 for timing in measure(decode_packed, len(rows))]
+    text_size = sum(len(fen) + len(moves) for fen, moves in rows) / len(rows)
+    packed_size = sum(len(data) for data in packed) / len(packed)
+    print(f'{len(rows)} puzzles from {args.db_path}')
+    print(f'  FEN + moves: {summarize(fen_timings, "us")}, {text_size:.0f} bytes')
+    print(f'  packed:      {summarize(packed_timings, "us")}, {packed_size:.0f} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import os
+import random
+import argparse
+import tempfile
+
+from data_managers import UserDataManager
+from .timing import measure, summarize
+
+
+THEMES = (
+    'mate', 'mateIn1', 'mateIn2', 'fork', 'pin', 'endgame', 'middlegame',
+    'short', 'long', 'crushing', 'advantage', 'promotion', 'castling', 'enPassant'
+)
+
+
+def create_user_data_manager(db_path: str) -> UserDataManager:
+    user_data_manager = UserDataManager(db_path)
+    user_data_manager.create_database()
+    user_data_manager.add_user('benchmark')
+    return user_data_manager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.solve_recording',
+        description='Time recording solved puzzles in a scratch users database.'
+    )
+    parser.add_argument('--solves', type=int, default=2000)
+    parser.add_argument('--themes', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    results = [
+        (' '.join(rng.sample(THEMES, args.themes)), rng.random() < 0.6)
+        for _ in range(args.solves)
+    ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, record in (
+            ('direct write', UserDataManager.update_user_puzzle_statistics),
+            ('journaled', UserDataManager.record_puzzle_result)
+        ):
+            db_path = os.path.join(temp_dir, f'{name.replace(" ", "_")}.db')
+            user_data_manager = create_user_data_manager(db_path)
+            pending = iter(results)
+            def record_next() -> None:
+                themes, solved = next(pending)
+                record(user_data_manager, 1, themes, solved)
+            timings = measure(record_next, args.solves)
+            user_data_manager.close()
+            user_data_manager.session.close()
+            user_data_manager.engine.dispose()
+
+            user_data_manager = UserDataManager(db_path)
+            statistics = user_data_manager.get_user_puzzle_statistics(1)
+            user_data_manager.close()
+            print(
+                f'{name}: {summarize(timings)} per solve, '
+                f'{statistics.puzzles_played} played, '
+                f'{statistics.puzzles_solved} solved'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import time
+import statistics
+
+from typing import Callable, List
+
+
+def measure(function: Callable[[], object], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return timings
+
+
+def summarize(timings: List[float], unit: str = 'ms') -> str:
+    ordered = sorted(timings)
+    return (
+        f'median {statistics.median(ordered):.3f} {unit}, '
+        f'p95 {ordered[int(len(ordered) * 0.95)]:.3f} {unit}'
+    )
@@ -1 +1,3 @@
-from .board import ChessBoard
\ No newline at end of file
+from .board import ChessBoard
+from .painted_board import PaintedChessBoard
+from .puzzle_session import PuzzleSession
\ No newline at end of file
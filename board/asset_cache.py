@@ -0,0 +1,55 @@
+import os
+
+from typing import Dict, Tuple
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt
+
+
+class AssetCache:
+    assets_dir = os.path.normpath(
+        os.path.join(os.path.dirname(__file__), '..', 'assets')
+    )
+    pixmaps: Dict[Tuple[str, str, str, int], QPixmap] = {}
+
+    @classmethod
+    def get_square_pixmap(
+        cls, board_style: str, color: str, size: int = 90
+    ) -> QPixmap:
+        return cls.get_pixmap('boards', board_style, color, size)
+
+    @classmethod
+    def get_piece_pixmap(
+        cls, piece_style: str, piece: str, color: str, size: int = 90
+    ) -> QPixmap:
+        return cls.get_pixmap('pieces', piece_style, f'{piece}-{color}', size)
+
+    @classmethod
+    def get_cursor_pixmap(cls, size: int = 15) -> QPixmap:
+        return cls.get_pixmap('other', '', 'closedhand', size)
+
+    @classmethod
+    def get_pixmap(cls, element: str, style: str, name: str, size: int) -> QPixmap:
+        key = (element, style, name, size)
+        pixmap = cls.pixmaps.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(
+                os.path.join(cls.assets_dir, element, style, f'{name}.png')
+            )
+            if not pixmap.isNull() and (
+                pixmap.width() != size or pixmap.height() != size
+            ):
+                pixmap = pixmap.scaled(
+                    size, size,
+                    Qt.AspectRatioMode.IgnoreAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                )
+            cls.pixmaps[key] = pixmap
+        return pixmap
+
+    @classmethod
+    def evict_unused_styles(cls, board_style: str, piece_style: str) -> None:
+        active_styles = {('boards', board_style), ('pieces', piece_style)}
+        for key in list(cls.pixmaps):
+            element, style = key[0], key[1]
+            if element != 'other' and (element, style) not in active_styles:
+                del cls.pixmaps[key]
@@ -1,23 +1,22 @@
-import os
-
 from typing import Tuple, Optional
 from PyQt6.QtWidgets import (
     QWidget, QGridLayout, QLabel, QSizePolicy, QGraphicsColorizeEffect
 )
-from PyQt6.QtGui import QPixmap, QColor, QMouseEvent
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QMouseEvent, QPainter, QPaintEvent, QPen
+from PyQt6.QtCore import Qt, QPointF, QRect, pyqtSignal
 
 from .pieces import *
+from .asset_cache import AssetCache
 from .board_controller import BoardController
+from data_managers import DataAccessWorker
 
 
 class ChessBoard(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, data_access: DataAccessWorker) -> None:
         super().__init__()
         self.board_style = 'dark_wood'
         self.piece_style = 'dark_wood'
-        self.set_assets_dir()
-        self.board_controller = BoardController(self)
+        self.board_controller = BoardController(self, data_access)
         self.initialize_board()
 
     board_status_signal = pyqtSignal(int)
@@ -28,17 +27,12 @@ class ChessBoard(QWidget):
             QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Minimum
         )
         self.setAcceptDrops(True)
+        self.piece_pool = PiecePool(self)
         self.initialize_layout()
         self.initialize_squares()
+        self.initialize_coordinates()
         self.board_controller.setup_board_coordinates(init=True)
 
-    def set_assets_dir(self) -> None:
-        assets_dir = os.path.join(
-            os.path.dirname(__file__), '..',
-            'assets', 'boards', self.board_style
-        )
-        self.assets_dir = os.path.normpath(assets_dir)
-
     def initialize_layout(self) -> None:
         self.grid_layout = QGridLayout(self)
         self.grid_layout.setSpacing(0)
@@ -46,14 +40,24 @@ class ChessBoard(QWidget):
         self.setLayout(self.grid_layout)
 
     def initialize_squares(self) -> None:
-        for widget in self.findChildren(ChessBoardSquare):
-            widget.deleteLater()
-
+        self.squares = []
         for row in range(8):
             for col in range(8):
                 square = ChessBoardSquare(row, col, self)
+                self.squares.append(square)
                 self.grid_layout.addWidget(square, row, col)
 
+    def initialize_coordinates(self) -> None:
+        self.col_coordinates = []
+        self.row_coordinates = []
+        for i in range(8):
+            col_label = ChessBoardCoordinate('', 'col', self)
+            row_label = ChessBoardCoordinate('', 'row', self)
+            self.col_coordinates.append(col_label)
+            self.row_coordinates.append(row_label)
+            self.grid_layout.addWidget(col_label, 8, i)
+            self.grid_layout.addWidget(row_label, i, 8)
+
     def initialize_puzzle(self) -> None:
         self.clear_board()
         self.board_controller.initialize_puzzle()
@@ -62,10 +66,10 @@ class ChessBoard(QWidget):
         return self.board_controller.get_current_puzzle_info()
 
     def clear_board(self) -> None:
-        for widget in self.findChildren(ChessPiece):
-            widget.deleteLater()
+        self.board_controller.puzzle_prefetcher.cancel_request()
+        self.board_controller.clear_pieces()
         self.board_controller.setup_board_coordinates(init=True)
-        self.board_controller.is_board_active = False
+        self.board_controller.end_session()
 
     def update_status(self, status: int) -> None:
         self.board_status_signal.emit(status)
@@ -73,8 +77,50 @@ class ChessBoard(QWidget):
     def set_style(self, board_style: str, piece_style: str) -> None:
         self.board_style = board_style
         self.piece_style = piece_style
-        self.set_assets_dir()
-        self.initialize_squares()
+        AssetCache.evict_unused_styles(board_style, piece_style)
+        for square in self.squares:
+            square.set_background()
+        self.board_controller.set_piece_style(piece_style)
+
+    def set_coordinates(self, player_color: str) -> None:
+        for i in range(8):
+            char = chr(ord('a') + i)
+            num = i
+            if player_color == 'b':
+                num = 7 - i
+                char = chr(ord('h') - i)
+            self.col_coordinates[i].setText(char)
+            self.row_coordinates[i].setText(str(8 - num))
+
+    def acquire_piece(
+        self,
+        piece_type: str,
+        square: str,
+        color: str,
+        piece_style: str,
+        is_active: bool
+    ) -> ChessPiece:
+        return self.piece_pool.acquire(
+            piece_type, square, color, piece_style, is_active
+        )
+
+    def place_piece(self, piece: ChessPiece, row: int, col: int) -> None:
+        self.grid_layout.removeWidget(piece)
+        self.grid_layout.addWidget(piece, row, col)
+
+    def remove_piece(self, piece: ChessPiece) -> None:
+        self.grid_layout.removeWidget(piece)
+        self.piece_pool.release(piece)
+
+    def show_legal_targets(self, piece: ChessPiece) -> None:
+        for row, col, is_capture in self.board_controller.get_legal_targets(piece):
+            self.squares[row * 8 + col].set_target_marker(
+                'capture' if is_capture else 'move'
+            )
+
+    def clear_legal_targets(self) -> None:
+        for square in self.squares:
+            square.set_target_marker(None)
 
 
 class ChessBoardSquare(QLabel):
@@ -83,6 +129,7 @@ class ChessBoardSquare(QLabel):
         self.board = board
         self.row = row
         self.col = col
+        self.target_marker = None
         self.initialize_square()
 
     def initialize_square(self) -> None:
@@ -91,17 +138,44 @@ class ChessBoardSquare(QLabel):
             QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum
         )
         self.setAcceptDrops(True)
+        self.setScaledContents(True)
         self.set_background()
 
     def set_background(self) -> None:
-        self.setScaledContents(True)
-        assets_dir = self.board.assets_dir
-        if (self.row + self.col) % 2 == 0:
-            background_image = QPixmap(os.path.join(assets_dir, 'white.png'))
-            self.setPixmap(background_image)
+        color = 'white' if (self.row + self.col) % 2 == 0 else 'black'
+        self.setPixmap(AssetCache.get_square_pixmap(self.board.board_style, color))
+
+    def set_target_marker(self, target_marker: Optional[str]) -> None:
+        if target_marker != self.target_marker:
+            self.target_marker = target_marker
+            self.update()
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+        if self.target_marker is not None:
+            painter = QPainter(self)
+            self.paint_target_marker(
+                painter, self.rect(), self.target_marker == 'capture'
+            )
+            painter.end()
+
+    @staticmethod
+    def paint_target_marker(painter: QPainter, rect: QRect, is_capture: bool) -> None:
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        color = QColor(0, 0, 0, 70)
+        size = min(rect.width(), rect.height())
+        if is_capture:
+            pen_width = size * 0.08
+            painter.setPen(QPen(color, pen_width))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            radius = (size - pen_width) / 2
         else:
-            background_image = QPixmap(os.path.join(assets_dir, 'black.png'))
-            self.setPixmap(background_image)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(color)
+            radius = size * 0.16
+        painter.drawEllipse(QPointF(rect.center()), radius, radius)
+        painter.restore()
 
     def dragEnterEvent(self, event: QMouseEvent) -> None:
         widget = event.source()
@@ -128,4 +202,19 @@ class ChessBoardSquare(QLabel):
             board.board_controller.handle_player_move(
                 widget, row=self.row, col=self.col
             )
-            event.accept()
\ No newline at end of file
+            event.accept()
+
+
+class ChessBoardCoordinate(QLabel):
+    def __init__(
+        self, text: str, type: str, parent: Optional[QWidget] = None
+    ) -> None:
+        super().__init__(text, parent)
+        if type == 'col':
+            self.setAlignment(
+                Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter
+            )
+        elif type == 'row':
+            self.setAlignment(
+                Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+            )
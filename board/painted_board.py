@@ -0,0 +1,307 @@
+from typing import List, Optional
+from PyQt6.QtWidgets import QSizePolicy
+from PyQt6.QtGui import (
+    QColor, QMouseEvent, QPainter, QPaintEvent, QPalette, QPixmap, QResizeEvent
+)
+from PyQt6.QtCore import Qt, QPoint, QRect, QSize
+
+from .asset_cache import AssetCache
+from .board import ChessBoard, ChessBoardSquare
+
+
+class BoardPiece:
+    def __init__(
+        self,
+        piece_type: str,
+        square: str,
+        color: str,
+        piece_style: str,
+        is_active: bool
+    ) -> None:
+        self.piece_type = piece_type
+        self.square = square
+        self.color = color
+        self.piece_style = piece_style
+        self.is_active = is_active
+        self.cell = None
+
+    def set_piece_style(self, piece_style: str) -> None:
+        self.piece_style = piece_style
+
+    def __str__(self) -> str:
+        return f'{self.square} {self.color} {self.piece_type.capitalize()}'
+
+
+class PaintedChessBoard(ChessBoard):
+    max_square_size = 90
+    coordinates_ratio = 0.3
+    move_highlight_color = QColor(128, 128, 128, 110)
+    capture_highlight_color = QColor(255, 0, 0, 90)
+
+    def initialize_board(self) -> None:
+        self.setMinimumSize(720, 720)
+        self.setSizePolicy(
+            QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Minimum
+        )
+        self.setMouseTracking(True)
+        self.cells: List[Optional[BoardPiece]] = [None] * 64
+        self.cell_rects: List[QRect] = [QRect() for _ in range(64)]
+        self.col_coordinates = [''] * 8
+        self.row_coordinates = [''] * 8
+        self.dragged_piece = None
+        self.drag_position = QPoint()
+        self.drag_offset = QPoint()
+        self.hover_cell = None
+        self.target_cells = {}
+        self.update_geometry()
+        self.board_controller.setup_board_coordinates(init=True)
+
+    def update_geometry(self) -> None:
+        square_size = min(
+            self.max_square_size,
+            min(self.width(), self.height()) / (8 + self.coordinates_ratio)
+        )
+        board_size = square_size * (8 + self.coordinates_ratio)
+        left = (self.width() - board_size) / 2
+        top = (self.height() - board_size) / 2
+        edges_x = [round(left + i * square_size) for i in range(9)]
+        edges_y = [round(top + i * square_size) for i in range(9)]
+
+        self.square_size = round(square_size)
+        self.coordinates_size = round(square_size * self.coordinates_ratio)
+        for row in range(8):
+            for col in range(8):
+                self.cell_rects[row * 8 + col] = QRect(
+                    QPoint(edges_x[col], edges_y[row]),
+                    QPoint(edges_x[col + 1] - 1, edges_y[row + 1] - 1)
+                )
+        self.board_rect = QRect(
+            QPoint(edges_x[0], edges_y[0]),
+            QPoint(edges_x[8] - 1, edges_y[8] - 1)
+        )
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        self.update_geometry()
+        super().resizeEvent(event)
+
+    def clear_board(self) -> None:
+        super().clear_board()
+        self.dragged_piece = None
+        self.hover_cell = None
+        self.target_cells = {}
+        self.unsetCursor()
+        self.update()
+
+    def set_style(self, board_style: str, piece_style: str) -> None:
+        self.board_style = board_style
+        self.piece_style = piece_style
+        AssetCache.evict_unused_styles(board_style, piece_style)
+        self.board_controller.set_piece_style(piece_style)
+        self.update()
+
+    def set_coordinates(self, player_color: str) -> None:
+        for i in range(8):
+            char = chr(ord('a') + i)
+            num = i
+            if player_color == 'b':
+                num = 7 - i
+                char = chr(ord('h') - i)
+            self.col_coordinates[i] = char
+            self.row_coordinates[i] = str(8 - num)
+        self.update()
+
+    def acquire_piece(
+        self,
+        piece_type: str,
+        square: str,
+        color: str,
+        piece_style: str,
+        is_active: bool
+    ) -> BoardPiece:
+        return BoardPiece(piece_type, square, color, piece_style, is_active)
+
+    def place_piece(self, piece: BoardPiece, row: int, col: int) -> None:
+        self.take_piece(piece)
+        piece.cell = row * 8 + col
+        self.cells[piece.cell] = piece
+        self.update(self.cell_rects[piece.cell])
+
+    def remove_piece(self, piece: BoardPiece) -> None:
+        self.take_piece(piece)
+        if piece is self.dragged_piece:
+            self.dragged_piece = None
+
+    def take_piece(self, piece: BoardPiece) -> None:
+        if piece.cell is not None and self.cells[piece.cell] is piece:
+            self.cells[piece.cell] = None
+            self.update(self.cell_rects[piece.cell])
+        piece.cell = None
+
+    def show_legal_targets(self, piece: BoardPiece) -> None:
+        self.clear_legal_targets()
+        for row, col, is_capture in self.board_controller.get_legal_targets(piece):
+            self.target_cells[row * 8 + col] = is_capture
+            self.update(self.cell_rects[row * 8 + col])
+
+    def clear_legal_targets(self) -> None:
+        for cell in self.target_cells:
+            self.update(self.cell_rects[cell])
+        self.target_cells = {}
+
+    def get_cell_at(self, position: QPoint) -> Optional[int]:
+        if not self.board_rect.contains(position):
+            return None
+        for cell, rect in enumerate(self.cell_rects):
+            if rect.contains(position):
+                return cell
+        return None
+
+    def get_piece_pixmap(self, piece: BoardPiece) -> QPixmap:
+        return AssetCache.get_piece_pixmap(
+            piece.piece_style, piece.piece_type, piece.color
+        )
+
+    def get_drag_rect(self) -> QRect:
+        return QRect(
+            self.drag_position - self.drag_offset,
+            QSize(self.square_size, self.square_size)
+        )
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        dirty_rect = event.rect()
+        light_square = AssetCache.get_square_pixmap(self.board_style, 'white')
+        dark_square = AssetCache.get_square_pixmap(self.board_style, 'black')
+
+        for cell, rect in enumerate(self.cell_rects):
+            if not rect.intersects(dirty_rect):
+                continue
+            row, col = divmod(cell, 8)
+            painter.drawPixmap(
+                rect, light_square if (row + col) % 2 == 0 else dark_square
+            )
+            piece = self.cells[cell]
+            if cell == self.hover_cell:
+                painter.fillRect(
+                    rect,
+                    self.capture_highlight_color if piece is not None
+                    else self.move_highlight_color
+                )
+            if cell in self.target_cells:
+                ChessBoardSquare.paint_target_marker(
+                    painter, rect, self.target_cells[cell]
+                )
+            if piece is not None and piece is not self.dragged_piece:
+                painter.drawPixmap(rect, self.get_piece_pixmap(piece))
+
+        self.paint_coordinates(painter, dirty_rect)
+        if self.dragged_piece is not None:
+            painter.drawPixmap(
+                self.get_drag_rect(), self.get_piece_pixmap(self.dragged_piece)
+            )
+        painter.end()
+
+    def paint_coordinates(self, painter: QPainter, dirty_rect: QRect) -> None:
+        painter.setPen(self.palette().color(QPalette.ColorRole.WindowText))
+        for i in range(8):
+            col_rect = self.cell_rects[56 + i]
+            col_rect = QRect(
+                col_rect.left(), col_rect.bottom() + 1,
+                col_rect.width(), self.coordinates_size
+            )
+            if col_rect.intersects(dirty_rect):
+                painter.drawText(
+                    col_rect,
+                    Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter,
+                    self.col_coordinates[i]
+                )
+            row_rect = self.cell_rects[i * 8 + 7]
+            row_rect = QRect(
+                row_rect.right() + 1, row_rect.top(),
+                self.coordinates_size, row_rect.height()
+            )
+            if row_rect.intersects(dirty_rect):
+                painter.drawText(
+                    row_rect,
+                    Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                    self.row_coordinates[i]
+                )
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        if (
+            event.button() != Qt.MouseButton.LeftButton or
+            not self.board_controller.is_board_active
+        ):
+            return
+
+        position = event.position().toPoint()
+        cell = self.get_cell_at(position)
+        piece = self.cells[cell] if cell is not None else None
+        if piece is None or not piece.is_active:
+            return
+
+        self.dragged_piece = piece
+        self.drag_offset = position - self.cell_rects[cell].topLeft()
+        self.drag_position = position
+        self.setCursor(Qt.CursorShape.ClosedHandCursor)
+        self.update(self.cell_rects[cell])
+        self.show_legal_targets(piece)
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        position = event.position().toPoint()
+        if self.dragged_piece is None:
+            self.update_cursor(position)
+            return
+
+        previous_rect = self.get_drag_rect()
+        self.drag_position = position
+        self.update(previous_rect.united(self.get_drag_rect()))
+        self.set_hover_cell(self.get_cell_at(position))
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        if (
+            event.button() != Qt.MouseButton.LeftButton or
+            self.dragged_piece is None
+        ):
+            return
+
+        piece = self.dragged_piece
+        target_cell = self.hover_cell
+        self.update(self.get_drag_rect())
+        self.set_hover_cell(None)
+        self.clear_legal_targets()
+        self.dragged_piece = None
+        if piece.cell is not None:
+            self.update(self.cell_rects[piece.cell])
+        self.update_cursor(event.position().toPoint())
+
+        if target_cell is not None:
+            self.board_controller.handle_player_move(
+                piece, row=target_cell // 8, col=target_cell % 8
+            )
+            self.update_cursor(event.position().toPoint())
+
+    def set_hover_cell(self, cell: Optional[int]) -> None:
+        if cell is not None:
+            square = self.board_controller.get_board_square_name(*divmod(cell, 8))
+            if not self.board_controller.validate_move(self.dragged_piece, square):
+                cell = None
+        if cell == self.hover_cell:
+            return
+
+        for changed_cell in (self.hover_cell, cell):
+            if changed_cell is not None:
+                self.update(self.cell_rects[changed_cell])
+        self.hover_cell = cell
+
+    def update_cursor(self, position: QPoint) -> None:
+        cell = self.get_cell_at(position)
+        piece = self.cells[cell] if cell is not None else None
+        if (
+            piece is not None and piece.is_active and
+            self.board_controller.is_board_active
+        ):
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+        else:
+            self.unsetCursor()
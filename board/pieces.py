@@ -1,12 +1,14 @@
-import os
-
-from typing import Optional
+from typing import Dict, List, Optional, Type
 from PyQt6.QtWidgets import QLabel, QWidget, QSizePolicy, QGraphicsColorizeEffect
-from PyQt6.QtGui import QPixmap, QDrag, QColor, QMouseEvent
+from PyQt6.QtGui import QDrag, QColor, QMouseEvent
 from PyQt6.QtCore import Qt, QMimeData
 
+from .asset_cache import AssetCache
+
 
 class ChessPiece(QLabel):
+    piece_type = ''
+
     def __init__(
         self,
         square: str,
@@ -16,28 +18,34 @@ class ChessPiece(QLabel):
         parent: QWidget
     ) -> None:
         super().__init__(parent)
-        self.square = square
-        self.color = color
-        self.piece_style = piece_style
-        self.is_active = is_active
-        self.set_assets_dir()
         self.initialize_piece()
+        self.set_piece(square, color, piece_style, is_active)
 
     def initialize_piece(self) -> None:
         self.setMaximumSize(90, 90)
         self.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setScaledContents(True)
-        if self.is_active:
+
+    def set_piece(
+        self, square: str, color: str, piece_style: str, is_active: bool
+    ) -> None:
+        self.square = square
+        self.color = color
+        self.is_active = is_active
+        self.set_piece_style(piece_style)
+        if is_active:
             self.setCursor(Qt.CursorShape.OpenHandCursor)
+            self.setAcceptDrops(False)
         else:
+            self.unsetCursor()
             self.setAcceptDrops(True)
 
-    def set_assets_dir(self) -> None:
-        assets_dir = os.path.join(
-            os.path.dirname(__file__), '..', 'assets', 'pieces', self.piece_style
+    def set_piece_style(self, piece_style: str) -> None:
+        self.piece_style = piece_style
+        self.setPixmap(
+            AssetCache.get_piece_pixmap(piece_style, self.piece_type, self.color)
         )
-        self.assets_dir = os.path.normpath(assets_dir)
 
     def __str__(self) -> str:
         return f'{self.square} {self.color} {self.__class__.__name__}'
@@ -47,19 +55,20 @@ class ChessPiece(QLabel):
             return
         
         if event.button() == Qt.MouseButton.LeftButton:
+            board = self.parentWidget()
+            board.show_legal_targets(self)
             self.setCursor(Qt.CursorShape.ClosedHandCursor)
             drag = QDrag(self)
             mimeData = QMimeData()
             drag.setMimeData(mimeData)
             drag.setHotSpot(event.pos() - self.rect().topLeft())
 
-            path = os.path.join(
-                os.path.dirname(__file__), '..', 'assets', 'other', 'closedhand.png'
+            drag.setDragCursor(
+                AssetCache.get_cursor_pixmap(), Qt.DropAction.MoveAction
             )
-            closed_hand_pixmap = QPixmap(path).scaled(15, 15)
-            drag.setDragCursor(closed_hand_pixmap, Qt.DropAction.MoveAction)
 
             drag.exec(Qt.DropAction.MoveAction)
+            board.clear_legal_targets()
             self.setCursor(Qt.CursorShape.OpenHandCursor)
 
     def dragEnterEvent(self, event: QMouseEvent) -> None:
@@ -88,90 +97,60 @@ class ChessPiece(QLabel):
     
 
 class King(ChessPiece):
-    def __init__(
-        self,
-        square: str,
-        color: str,
-        piece_style: str,
-        is_active: bool,
-        parent: QWidget
-    ) -> None:
-        super().__init__(square, color, piece_style, is_active, parent)
-        self.setPixmap(
-            QPixmap(os.path.join(self.assets_dir, f'king-{color}.png'))
-        )
+    piece_type = 'king'
 
 
 class Queen(ChessPiece):
-    def __init__(
-        self,
-        square: str,
-        color: str,
-        piece_style: str,
-        is_active: bool,
-        parent: QWidget
-    ) -> None:
-        super().__init__(square, color, piece_style, is_active, parent)
-        self.setPixmap(
-            QPixmap(os.path.join(self.assets_dir, f'queen-{color}.png'))
-        )
+    piece_type = 'queen'
 
 
 class Rook(ChessPiece):
-    def __init__(
-        self,
-        square: str,
-        color: str,
-        piece_style: str,
-        is_active: bool,
-        parent: QWidget
-    ) -> None:
-        super().__init__(square, color, piece_style, is_active, parent)
-        self.setPixmap(
-            QPixmap(os.path.join(self.assets_dir, f'rook-{color}.png'))
-        )
+    piece_type = 'rook'
 
 
 class Bishop(ChessPiece):
-    def __init__(
-        self,
-        square: str,
-        color: str,
-        piece_style: str,
-        is_active: bool,
-        parent: QWidget
-    ) -> None:
-        super().__init__(square, color, piece_style, is_active, parent)
-        self.setPixmap(
-            QPixmap(os.path.join(self.assets_dir, f'bishop-{color}.png'))
-        )
+    piece_type = 'bishop'
 
 
 class Knight(ChessPiece):
-    def __init__(
-        self,
-        square: str,
-        color: str,
-        piece_style: str,
-        is_active: bool,
-        parent: QWidget
-    ) -> None:
-        super().__init__(square, color, piece_style, is_active, parent)
-        self.setPixmap(
-            QPixmap(os.path.join(self.assets_dir, f'knight-{color}.png'))
-        )
+    piece_type = 'knight'
 
 
 class Pawn(ChessPiece):
-    def __init__(
+    piece_type = 'pawn'
+
+
+class PiecePool:
+    piece_classes: Dict[str, Type[ChessPiece]] = {
+        'king': King, 'queen': Queen, 'rook': Rook,
+        'bishop': Bishop, 'knight': Knight, 'pawn': Pawn
+    }
+
+    def __init__(self, parent: QWidget) -> None:
+        self.parent = parent
+        self.free_pieces: Dict[str, List[ChessPiece]] = {}
+        self.created_pieces = 0
+
+    def acquire(
         self,
+        piece_type: str,
         square: str,
         color: str,
         piece_style: str,
-        is_active: bool,
-        parent: QWidget
-    ) -> None:
-        super().__init__(square, color, piece_style, is_active, parent)
-        self.setPixmap(
-            QPixmap(os.path.join(self.assets_dir, f'pawn-{color}.png'))
-        )
\ No newline at end of file
+        is_active: bool
+    ) -> ChessPiece:
+        free_pieces = self.free_pieces.get(piece_type)
+        if free_pieces:
+            piece = free_pieces.pop()
+            piece.set_piece(square, color, piece_style, is_active)
+            piece.show()
+            return piece
+
+        self.created_pieces += 1
+        piece_class = self.piece_classes[piece_type]
+        return piece_class(square, color, piece_style, is_active, self.parent)
+
+    def release(self, piece: ChessPiece) -> None:
+        piece.hide()
+        piece.setGraphicsEffect(None)
+        self.free_pieces.setdefault(piece.piece_type, []).append(piece)
@@ -0,0 +1,125 @@
+import chess
+
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple, Union
+
+from data_managers import DataAccessWorker, PuzzleCodec
+from data_managers.puzzle_models import PuzzleInfo, PuzzleMoves
+from data_managers.puzzle_store import StoredPuzzle
+
+
+PreparedPuzzle = Tuple[Union[PuzzleInfo, StoredPuzzle], chess.Board, List[str]]
+FetchResult = Tuple[Optional[PreparedPuzzle], bool]
+
+
+class PuzzlePrefetcher:
+    def __init__(
+        self,
+        data_access: DataAccessWorker,
+        size: int = 3,
+        attempts: int = 3,
+        max_failures: int = 3
+    ) -> None:
+        self.data_access = data_access
+        self.size = size
+        self.attempts = attempts
+        self.max_failures = max_failures
+        self.filters = (None, None, None, None, None)
+        self.generation = 0
+        self.puzzles: Deque[PreparedPuzzle] = deque()
+        self.pending = 0
+        self.is_exhausted = False
+        self.failures = 0
+        self.waiting_callback = None
+        self.codec = PuzzleCodec()
+
+    def set_filters(
+        self,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        theme: Optional[str] = None,
+        player_color: Optional[str] = None,
+        num_player_moves: Optional[int] = None
+    ) -> None:
+        filters = (min_rating, max_rating, theme, player_color, num_player_moves)
+        if filters == self.filters:
+            return
+        self.filters = filters
+        self.generation += 1
+        self.puzzles.clear()
+        self.pending = 0
+        self.is_exhausted = False
+        self.failures = 0
+        self.fill()
+
+    def request_puzzle(
+        self, callback: Callable[[Optional[PreparedPuzzle]], None]
+    ) -> None:
+        self.waiting_callback = None
+        if self.puzzles:
+            puzzle = self.puzzles.popleft()
+            self.fill()
+            callback(puzzle)
+        elif self.is_exhausted:
+            callback(None)
+        else:
+            self.waiting_callback = callback
+            self.fill()
+
+    def cancel_request(self) -> None:
+        self.waiting_callback = None
+
+    def fill(self) -> None:
+        while not self.is_exhausted and len(self.puzzles) + self.pending < self.size:
+            self.pending += 1
+            generation = self.generation
+            self.data_access.submit(
+                self.fetch_puzzle, self.filters,
+                callback=lambda result: self.store_puzzle(generation, result)
+            )
+
+    def fetch_puzzle(
+        self,
+        filters: Tuple[
+            Optional[int], Optional[int], Optional[str], Optional[str], Optional[int]
+        ]
+    ) -> FetchResult:
+        puzzle_manager = self.data_access.puzzle_manager
+        for _ in range(self.attempts):
+            result = puzzle_manager.get_puzzle(*filters)
+            if result is not None:
+                return self.prepare_puzzle(result), False
+        return None, puzzle_manager.get_puzzle_count(*filters) == 0
+
+    def prepare_puzzle(
+        self, result: Union[Tuple[PuzzleInfo, PuzzleMoves], StoredPuzzle]
+    ) -> PreparedPuzzle:
+        if isinstance(result, StoredPuzzle):
+            return result, result.board, result.moves
+        puzzle_info, puzzle_moves = result
+        if puzzle_moves.packed is not None:
+            board, moves = self.codec.decode(puzzle_moves.packed)
+        else:
+            board, moves = chess.Board(puzzle_moves.fen), puzzle_moves.moves.split()
+        return puzzle_info, board, moves
+
+    def store_puzzle(self, generation: int, result: Optional[FetchResult]) -> None:
+        if generation != self.generation:
+            return
+        self.pending -= 1
+        puzzle, is_empty = result if result is not None else (None, False)
+        if puzzle is not None:
+            self.puzzles.append(puzzle)
+            self.failures = 0
+        elif is_empty:
+            self.is_exhausted = True
+        else:
+            self.failures += 1
+            self.is_exhausted = self.failures >= self.max_failures
+
+        if self.waiting_callback is not None:
+            callback = self.waiting_callback
+            self.waiting_callback = None
+            self.request_puzzle(callback)
+        else:
+            self.fill()
\ No newline at end of file
@@ -0,0 +1,129 @@
+import chess
+import chess.polyglot
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class SessionMove(NamedTuple):
+    move: chess.Move
+    captured_square: chess.Square
+    rook_move: Optional[Tuple[chess.Square, chess.Square]]
+
+
+class LegalTarget(NamedTuple):
+    is_promotion: bool
+    is_capture: bool
+
+
+LegalMoves = Dict[str, Dict[str, LegalTarget]]
+
+
+class PuzzleSession:
+    legal_moves_cache: Dict[int, LegalMoves] = {}
+    legal_moves_cache_size = 256
+    legal_move_counters = {'generated': 0, 'reused': 0}
+
+    def __init__(
+        self,
+        board: chess.Board,
+        moves: List[str],
+        player_color: Optional[str] = None
+    ) -> None:
+        self.board = board
+        self.moves = moves
+        self.current_move = 0
+        self.player_color = player_color or (
+            'b' if board.turn == chess.WHITE else 'w'
+        )
+        self.is_active = True
+        self.was_incorrect_move = False
+        self.was_hint_used = False
+        self.legal_moves = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.current_move >= len(self.moves)
+
+    @property
+    def is_solved_cleanly(self) -> bool:
+        return not self.was_incorrect_move and not self.was_hint_used
+
+    def get_legal_moves(self) -> LegalMoves:
+        if self.legal_moves is not None:
+            return self.legal_moves
+
+        position_key = chess.polyglot.zobrist_hash(self.board)
+        legal_moves = self.legal_moves_cache.get(position_key)
+        if legal_moves is None:
+            legal_moves = self.generate_legal_moves()
+            if len(self.legal_moves_cache) >= self.legal_moves_cache_size:
+                self.legal_moves_cache.clear()
+            self.legal_moves_cache[position_key] = legal_moves
+            self.legal_move_counters['generated'] += 1
+        else:
+            self.legal_move_counters['reused'] += 1
+        self.legal_moves = legal_moves
+        return legal_moves
+
+    def generate_legal_moves(self) -> LegalMoves:
+        legal_moves: LegalMoves = {}
+        for move in self.board.generate_legal_moves():
+            destinations = legal_moves.setdefault(
+                chess.square_name(move.from_square), {}
+            )
+            destinations[chess.square_name(move.to_square)] = LegalTarget(
+                move.promotion is not None, self.board.is_capture(move)
+            )
+        return legal_moves
+
+    def validate_move(self, from_square: str, to_square: str) -> bool:
+        return to_square in self.get_legal_moves().get(from_square, {})
+
+    def check_for_promotion(self, from_square: str, to_square: str) -> bool:
+        target = self.get_legal_moves().get(from_square, {}).get(to_square)
+        return target is not None and target.is_promotion
+
+    def get_next_move(self) -> Optional[str]:
+        if not self.is_active:
+            return None
+        self.was_hint_used = True
+        return self.moves[self.current_move]
+
+    def play_player_move(self, uci_move: str) -> Optional[SessionMove]:
+        if not self.is_active:
+            return None
+        if uci_move != self.moves[self.current_move]:
+            self.was_incorrect_move = True
+            return None
+        return self.make_move(uci_move)
+
+    def play_computer_move(self) -> Optional[SessionMove]:
+        if self.is_complete:
+            self.is_active = False
+            return None
+        return self.make_move(self.moves[self.current_move])
+
+    def make_move(self, uci_move: str) -> SessionMove:
+        self.current_move += 1
+        move = chess.Move.from_uci(uci_move)
+        captured_square = move.to_square
+        if self.board.is_en_passant(move):
+            captured_square = chess.square(
+                chess.square_file(move.to_square),
+                chess.square_rank(move.from_square)
+            )
+        rook_move = (
+            self.get_castling_rook_move(move)
+            if self.board.is_castling(move) else None
+        )
+        self.board.push(move)
+        self.legal_moves = None
+        return SessionMove(move, captured_square, rook_move)
+
+    def get_castling_rook_move(
+        self, move: chess.Move
+    ) -> Tuple[chess.Square, chess.Square]:
+        rank = chess.square_rank(move.from_square)
+        if chess.square_file(move.to_square) > chess.square_file(move.from_square):
+            return chess.square(7, rank), chess.square(5, rank)
+        return chess.square(0, rank), chess.square(3, rank)
@@ -1,2 +1,8 @@
 from .user_data_manager import UserDataManager
-from .puzzle_manager import PuzzleManager
\ No newline at end of file
+from .puzzle_manager import PuzzleManager
+from .puzzle_migrations import PuzzleMigrator
+from .puzzle_importer import PuzzleImporter
+from .puzzle_codec import PuzzleCodec
+from .puzzle_store import PuzzleStore, PuzzleStoreBuilder
+from .puzzle_validator import PuzzleValidator
+from .data_access_worker import DataAccessWorker
\ No newline at end of file
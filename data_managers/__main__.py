@@ -0,0 +1,121 @@
+import os
+import argparse
+
+from sqlalchemy import create_engine
+
+from .puzzle_migrations import PuzzleMigrator
+from .puzzle_importer import PuzzleImporter
+from .puzzle_store import DEFAULT_STORE_PATH, PuzzleStoreBuilder
+from .puzzle_validator import PuzzleValidator
+
+
+DEFAULT_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'puzzles_db.db')
+)
+
+
+def migrate(args: argparse.Namespace) -> None:
+    engine = create_engine(f'sqlite:///{args.db_path}')
+    migrator = PuzzleMigrator(engine)
+    previous_version = migrator.get_schema_version()
+    applied = migrator.rebuild() if args.rebuild else migrator.migrate()
+    print(
+        f'{args.db_path}: schema version {previous_version} -> '
+        f'{migrator.get_schema_version()} ({applied} migrations applied)'
+    )
+    engine.dispose()
+
+
+def import_puzzles(args: argparse.Namespace) -> None:
+    importer = PuzzleImporter(
+        args.db_path, args.batch_size, args.transaction_size
+    )
+    if args.incremental:
+        importer.import_delta(args.csv_path)
+    else:
+        importer.import_csv(args.csv_path)
+
+
+def pack_puzzles(args: argparse.Namespace) -> None:
+    PuzzleImporter(args.db_path, args.batch_size).pack_puzzles()
+
+
+def build_store(args: argparse.Namespace) -> None:
+    PuzzleStoreBuilder(args.db_path, args.store_path, args.batch_size).build()
+
+
+def validate_puzzles(args: argparse.Namespace) -> None:
+    problems = PuzzleValidator(
+        args.db_path, args.chunk_size, args.workers
+    ).validate(args.report, args.quarantine)
+    if problems and args.report is None:
+        for puzzle_id, problem in sorted(problems.items()):
+            print(f'{puzzle_id}: {problem}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m data_managers',
+        description='Maintenance commands for the puzzles database.'
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    migrate_parser = subparsers.add_parser(
+        'migrate', help='apply pending schema migrations'
+    )
+    migrate_parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    migrate_parser.add_argument(
+        '--rebuild', action='store_true',
+        help='reapply every migration, rebuilding derived tables and indexes'
+    )
+    migrate_parser.set_defaults(command=migrate)
+
+    import_parser = subparsers.add_parser(
+        'import', help='load a Lichess puzzle CSV (.csv, .csv.gz or .csv.zst)'
+    )
+    import_parser.add_argument('csv_path')
+    import_parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    import_parser.add_argument('--batch-size', type=int, default=10000)
+    import_parser.add_argument('--transaction-size', type=int, default=500000)
+    import_parser.add_argument(
+        '--incremental', action='store_true',
+        help='upsert only new or changed puzzles into the existing database'
+    )
+    import_parser.set_defaults(command=import_puzzles)
+
+    pack_parser = subparsers.add_parser(
+        'pack', help='store a compact binary encoding of every puzzle position'
+    )
+    pack_parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    pack_parser.add_argument('--batch-size', type=int, default=10000)
+    pack_parser.set_defaults(command=pack_puzzles)
+
+    store_parser = subparsers.add_parser(
+        'store', help='build the read-only memory-mapped puzzle store'
+    )
+    store_parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    store_parser.add_argument('--store-path', default=DEFAULT_STORE_PATH)
+    store_parser.add_argument('--batch-size', type=int, default=10000)
+    store_parser.set_defaults(command=build_store)
+
+    validate_parser = subparsers.add_parser(
+        'validate', help='replay every puzzle and report broken rows'
+    )
+    validate_parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    validate_parser.add_argument('--chunk-size', type=int, default=20000)
+    validate_parser.add_argument('--workers', type=int, default=None)
+    validate_parser.add_argument(
+        '--report', help='write the invalid puzzle ids and problems to a CSV file'
+    )
+    validate_parser.add_argument(
+        '--quarantine', action='store_true',
+        help='move invalid puzzles into the puzzle_quarantine table'
+    )
+    validate_parser.set_defaults(command=validate_puzzles)
+
+    args = parser.parse_args()
+    args.command(args)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
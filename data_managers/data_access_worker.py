@@ -0,0 +1,61 @@
+import os
+import logging
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+from .puzzle_manager import PuzzleManager
+from .puzzle_store import PuzzleStore
+from .user_data_manager import UserDataManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class DataAccessWorker(QObject):
+    result_ready = pyqtSignal(object, object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='DataAccessWorker'
+        )
+        self.result_ready.connect(
+            self.deliver_result, Qt.ConnectionType.QueuedConnection
+        )
+        self.puzzle_manager = None
+        self.user_data_manager = None
+        self.executor.submit(self.initialize_managers).result()
+
+    def initialize_managers(self) -> None:
+        store_path = os.environ.get('CHESS_EXERCISES_PUZZLE_STORE')
+        if store_path:
+            self.puzzle_manager = PuzzleStore(store_path)
+        else:
+            self.puzzle_manager = PuzzleManager()
+        self.user_data_manager = UserDataManager()
+
+    def submit(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+        callback: Optional[Callable[[Any], None]] = None
+    ) -> Future:
+        future = self.executor.submit(function, *args)
+        if callback is not None:
+            future.add_done_callback(
+                lambda future: self.result_ready.emit(callback, future)
+            )
+        return future
+
+    def deliver_result(self, callback: Callable[[Any], None], future: Future) -> None:
+        try:
+            result = future.result()
+        except Exception:
+            logger.exception('Data access call failed')
+            result = None
+        callback(result)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
\ No newline at end of file
@@ -0,0 +1,88 @@
+import struct
+import chess
+
+from typing import List, Tuple
+
+
+class PuzzleCodec:
+    header = struct.Struct('<32sBBHHB')
+    piece_codes = {
+        (color, piece_type): (0 if color == chess.WHITE else 8) | piece_type
+        for color in chess.COLORS for piece_type in chess.PIECE_TYPES
+    }
+    castling_squares = (chess.H1, chess.A1, chess.H8, chess.A8)
+    no_square = 0xFF
+
+    def encode(self, fen: str, moves: str) -> bytes:
+        board = chess.Board(fen)
+        packed_board = bytearray(32)
+        for square, piece in board.piece_map().items():
+            code = self.piece_codes[(piece.color, piece.piece_type)]
+            packed_board[square >> 1] |= code << (4 * (square & 1))
+
+        flags = int(board.turn == chess.WHITE)
+        for bit, square in enumerate(self.castling_squares):
+            if board.castling_rights & chess.BB_SQUARES[square]:
+                flags |= 2 << bit
+        ep_square = board.ep_square if board.ep_square is not None else self.no_square
+
+        encoded_moves = []
+        for uci_move in moves.split():
+            move = chess.Move.from_uci(uci_move)
+            encoded_moves.append(
+                move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+            )
+        return self.header.pack(
+            bytes(packed_board), flags, ep_square,
+            board.halfmove_clock, board.fullmove_number, len(encoded_moves)
+        ) + struct.pack(f'<{len(encoded_moves)}H', *encoded_moves)
+
+    def decode(self, data: bytes) -> Tuple[chess.Board, List[str]]:
+        (
+            packed_board, flags, ep_square,
+            halfmove_clock, fullmove_number, moves_count
+        ) = self.header.unpack_from(data)
+
+        piece_masks = [0] * 16
+        square = 0
+        for byte in packed_board:
+            if byte & 0x0F:
+                piece_masks[byte & 0x0F] |= 1 << square
+            if byte >> 4:
+                piece_masks[byte >> 4] |= 1 << (square + 1)
+            square += 2
+
+        board = chess.Board(None)
+        board.pawns = piece_masks[1] | piece_masks[9]
+        board.knights = piece_masks[2] | piece_masks[10]
+        board.bishops = piece_masks[3] | piece_masks[11]
+        board.rooks = piece_masks[4] | piece_masks[12]
+        board.queens = piece_masks[5] | piece_masks[13]
+        board.kings = piece_masks[6] | piece_masks[14]
+        board.occupied_co[chess.WHITE] = (
+            piece_masks[1] | piece_masks[2] | piece_masks[3] |
+            piece_masks[4] | piece_masks[5] | piece_masks[6]
+        )
+        board.occupied_co[chess.BLACK] = (
+            piece_masks[9] | piece_masks[10] | piece_masks[11] |
+            piece_masks[12] | piece_masks[13] | piece_masks[14]
+        )
+        board.occupied = board.occupied_co[chess.WHITE] | board.occupied_co[chess.BLACK]
+
+        board.turn = bool(flags & 1)
+        board.castling_rights = 0
+        for bit, castling_square in enumerate(self.castling_squares):
+            if flags & (2 << bit):
+                board.castling_rights |= chess.BB_SQUARES[castling_square]
+        board.ep_square = None if ep_square == self.no_square else ep_square
+        board.halfmove_clock = halfmove_clock
+        board.fullmove_number = fullmove_number
+
+        moves = []
+        for (code,) in struct.iter_unpack(
+            '<H', data[self.header.size:self.header.size + 2 * moves_count]
+        ):
+            promotion = code >> 12
+            move = chess.SQUARE_NAMES[code & 0x3F] + chess.SQUARE_NAMES[(code >> 6) & 0x3F]
+            moves.append(move + chess.piece_symbol(promotion) if promotion else move)
+        return board, moves
@@ -0,0 +1,353 @@
+import io
+import os
+import csv
+import gzip
+import time
+import struct
+import hashlib
+
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from sqlalchemy import (
+    Connection, Engine, create_engine, event, select, insert, update, bindparam
+)
+
+from .puzzle_models import Base, PuzzleInfo, PuzzleMoves
+from .puzzle_migrations import PuzzleMigrator, PuzzleState
+from .puzzle_codec import PuzzleCodec
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+LICHESS_COLUMNS = (
+    'PuzzleId', 'FEN', 'Moves', 'Rating', 'RatingDeviation',
+    'Popularity', 'NbPlays', 'Themes', 'GameUrl', 'OpeningTags'
+)
+
+
+class PuzzleImporter:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        batch_size: int = 10000,
+        transaction_size: int = 500000
+    ) -> None:
+        self.db_path = db_path or os.path.normpath(
+            os.path.join(
+                os.path.dirname(__file__), '..', 'data', 'puzzles_db.db'
+            )
+        )
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+
+    def create_engine(
+        self, bulk_load: bool = False, db_path: Optional[str] = None
+    ) -> Engine:
+        engine = create_engine(f'sqlite:///{db_path or self.db_path}')
+        if bulk_load:
+            event.listen(engine, 'connect', self.set_load_pragmas)
+        return engine
+
+    def open_csv(self, csv_path: str) -> TextIO:
+        if csv_path.endswith('.gz'):
+            return gzip.open(csv_path, 'rt', encoding='utf-8', newline='')
+        if csv_path.endswith('.zst'):
+            if zstandard is None:
+                raise RuntimeError(
+                    'Reading .zst files requires the zstandard package'
+                )
+            stream = zstandard.ZstdDecompressor().stream_reader(open(csv_path, 'rb'))
+            return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        return open(csv_path, 'r', encoding='utf-8', newline='')
+
+    def read_rows(self, csv_path: str) -> Iterator[Dict[str, str]]:
+        with self.open_csv(csv_path) as file:
+            reader = csv.reader(file)
+            first_row = next(reader, None)
+            if first_row is None:
+                return
+            if first_row[0] == LICHESS_COLUMNS[0]:
+                columns = first_row
+            else:
+                columns = LICHESS_COLUMNS
+                yield dict(zip(columns, first_row))
+            for row in reader:
+                yield dict(zip(columns, row))
+
+    def set_load_pragmas(self, dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode = OFF')
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA temp_store = MEMORY')
+        cursor.execute('PRAGMA cache_size = -262144')
+        cursor.close()
+
+    def prepare_tables(self, connection: Connection) -> None:
+        Base.metadata.create_all(
+            connection, tables=[PuzzleInfo.__table__, PuzzleMoves.__table__]
+        )
+
+    def get_content_hash(self, row: Dict[str, str]) -> str:
+        content = f'{row["FEN"]}|{row["Moves"]}|{row["Themes"]}'
+        return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+
+    def insert_batch(self, connection: Connection, batch: List[Dict[str, str]]) -> None:
+        connection.execute(
+            insert(PuzzleInfo).prefix_with('OR REPLACE'),
+            [
+                {
+                    'puzzle_id': row['PuzzleId'],
+                    'rating': int(row['Rating']),
+                    'rating_deviation': int(row['RatingDeviation']),
+                    'themes': row['Themes'],
+                    'content_hash': self.get_content_hash(row),
+                    **PuzzleMigrator.get_puzzle_metadata(row['FEN'], row['Moves'])
+                }
+                for row in batch
+            ]
+        )
+        connection.execute(
+            insert(PuzzleMoves).prefix_with('OR REPLACE'),
+            [
+                {
+                    'puzzle_id': row['PuzzleId'],
+                    'fen': row['FEN'],
+                    'moves': row['Moves']
+                }
+                for row in batch
+            ]
+        )
+
+    def import_csv(self, csv_path: str) -> int:
+        start_time = time.perf_counter()
+        imported = 0
+
+        import_path = f'{self.db_path}.import'
+        if os.path.exists(import_path):
+            os.remove(import_path)
+        try:
+            engine = self.create_engine(bulk_load=True, db_path=import_path)
+            with engine.connect() as connection:
+                self.prepare_tables(connection)
+                connection.commit()
+
+                batch = []
+                uncommitted = 0
+                for row in self.read_rows(csv_path):
+                    batch.append(row)
+                    if len(batch) < self.batch_size:
+                        continue
+                    self.insert_batch(connection, batch)
+                    imported += len(batch)
+                    uncommitted += len(batch)
+                    batch = []
+                    if uncommitted >= self.transaction_size:
+                        connection.commit()
+                        uncommitted = 0
+                        self.report_progress(imported, start_time)
+                if batch:
+                    self.insert_batch(connection, batch)
+                    imported += len(batch)
+                connection.commit()
+
+            PuzzleMigrator(engine).rebuild()
+            engine.dispose()
+            os.replace(import_path, self.db_path)
+        finally:
+            if os.path.exists(import_path):
+                os.remove(import_path)
+
+        elapsed = time.perf_counter() - start_time
+        print(
+            f'Imported {imported} puzzles in {elapsed:.1f}s including indexes '
+            f'({imported / max(elapsed, 1e-9):.0f} rows/s)'
+        )
+        return imported
+
+    def import_delta(self, csv_path: str) -> Dict[str, int | float]:
+        start_time = time.perf_counter()
+        summary = {'inserted': 0, 'updated': 0, 'rerated': 0, 'unchanged': 0}
+
+        engine = self.create_engine()
+        migrator = PuzzleMigrator(engine)
+        migrator.migrate()
+        with engine.begin() as connection:
+            previous: Dict[str, Optional[PuzzleState]] = {}
+            batch = []
+            for row in self.read_rows(csv_path):
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self.merge_batch(connection, batch, summary, previous)
+                    batch = []
+            if batch:
+                self.merge_batch(connection, batch, summary, previous)
+
+            if previous:
+                migrator.update_puzzles(connection, previous)
+                migrator.write_catalog(connection)
+        engine.dispose()
+
+        summary['seconds'] = time.perf_counter() - start_time
+        print(
+            f'Inserted {summary["inserted"]}, updated {summary["updated"]}, '
+            f're-rated {summary["rerated"]}, unchanged {summary["unchanged"]} '
+            f'puzzles in {summary["seconds"]:.1f}s'
+        )
+        return summary
+
+    def merge_batch(
+        self,
+        connection: Connection,
+        batch: List[Dict[str, str]],
+        summary: Dict[str, int | float],
+        previous: Dict[str, Optional[PuzzleState]]
+    ) -> None:
+        query = (
+            select(
+                PuzzleInfo.puzzle_id,
+                PuzzleInfo.content_hash,
+                PuzzleInfo.rating,
+                PuzzleInfo.rating_deviation,
+                PuzzleInfo.themes,
+                PuzzleInfo.player_color,
+                PuzzleInfo.num_player_moves,
+                PuzzleMoves.fen,
+                PuzzleMoves.moves
+            )
+            .outerjoin(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+            .where(PuzzleInfo.puzzle_id.in_([row['PuzzleId'] for row in batch]))
+        )
+        existing = {record.puzzle_id: record for record in connection.execute(query)}
+
+        changed = []
+        rerated = []
+        hashed = []
+        for row in batch:
+            puzzle_id = row['PuzzleId']
+            record = existing.get(puzzle_id)
+            if record is None:
+                summary['inserted'] += 1
+                changed.append(row)
+                previous.setdefault(puzzle_id, None)
+                continue
+
+            state = None
+            if record.moves is not None and record.player_color is not None:
+                state = (
+                    record.rating, record.themes,
+                    record.player_color, record.num_player_moves
+                )
+            content_hash = self.get_content_hash(row)
+            stored_hash = record.content_hash
+            if stored_hash is None and record.moves is not None:
+                stored_hash = self.get_content_hash({
+                    'FEN': record.fen, 'Moves': record.moves, 'Themes': record.themes
+                })
+                if stored_hash == content_hash:
+                    hashed.append({
+                        'b_puzzle_id': puzzle_id, 'b_content_hash': content_hash
+                    })
+
+            if stored_hash != content_hash:
+                summary['updated'] += 1
+                changed.append(row)
+                previous.setdefault(puzzle_id, state)
+            elif (
+                record.rating != int(row['Rating']) or
+                record.rating_deviation != int(row['RatingDeviation'])
+            ):
+                summary['rerated'] += 1
+                rerated.append({
+                    'b_puzzle_id': puzzle_id,
+                    'b_rating': int(row['Rating']),
+                    'b_rating_deviation': int(row['RatingDeviation'])
+                })
+                if record.rating != int(row['Rating']):
+                    previous.setdefault(puzzle_id, state)
+            else:
+                summary['unchanged'] += 1
+
+        if changed:
+            self.insert_batch(connection, changed)
+        if rerated:
+            query = (
+                update(PuzzleInfo)
+                .where(PuzzleInfo.puzzle_id == bindparam('b_puzzle_id'))
+                .values(
+                    rating=bindparam('b_rating'),
+                    rating_deviation=bindparam('b_rating_deviation')
+                )
+            )
+            connection.execute(query, rerated)
+        if hashed:
+            query = (
+                update(PuzzleInfo)
+                .where(PuzzleInfo.puzzle_id == bindparam('b_puzzle_id'))
+                .values(content_hash=bindparam('b_content_hash'))
+            )
+            connection.execute(query, hashed)
+
+    def pack_puzzles(self) -> int:
+        start_time = time.perf_counter()
+        codec = PuzzleCodec()
+        packed = 0
+        failures: Dict[str, str] = {}
+
+        engine = self.create_engine()
+        PuzzleMigrator(engine).migrate()
+        with engine.connect() as connection:
+            query = (
+                select(PuzzleMoves.puzzle_id, PuzzleMoves.fen, PuzzleMoves.moves)
+                .where(
+                    PuzzleMoves.packed.is_(None),
+                    PuzzleMoves.puzzle_id > bindparam('b_last_puzzle_id')
+                )
+                .order_by(PuzzleMoves.puzzle_id)
+                .limit(self.batch_size)
+            )
+            update_query = (
+                update(PuzzleMoves)
+                .where(PuzzleMoves.puzzle_id == bindparam('b_puzzle_id'))
+                .values(packed=bindparam('b_packed'))
+            )
+            last_puzzle_id = ''
+            while True:
+                rows = connection.execute(
+                    query, {'b_last_puzzle_id': last_puzzle_id}
+                ).all()
+                if not rows:
+                    break
+                last_puzzle_id = rows[-1].puzzle_id
+
+                updates = []
+                for puzzle_id, fen, moves in rows:
+                    try:
+                        updates.append({
+                            'b_puzzle_id': puzzle_id,
+                            'b_packed': codec.encode(fen, moves)
+                        })
+                    except (ValueError, struct.error) as error:
+                        failures[puzzle_id] = str(error)
+                if updates:
+                    connection.execute(update_query, updates)
+                    connection.commit()
+                packed += len(updates)
+                self.report_progress(packed, start_time)
+        engine.dispose()
+
+        elapsed = time.perf_counter() - start_time
+        print(f'Packed {packed} puzzles in {elapsed:.1f}s')
+        if failures:
+            print(
+                f'Left {len(failures)} puzzles unpacked because they could not be '
+                f'encoded (run validate --quarantine to move them aside):'
+            )
+            for puzzle_id, error in sorted(failures.items())[:20]:
+                print(f'{puzzle_id}: {error}')
+        return packed
+
+    def report_progress(self, imported: int, start_time: float) -> None:
+        elapsed = time.perf_counter() - start_time
+        print(f'{imported} rows loaded ({imported / max(elapsed, 1e-9):.0f} rows/s)')
\ No newline at end of file
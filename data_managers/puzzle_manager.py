@@ -1,61 +1,39 @@
 import os
+import random
 
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm.session import Session
-from sqlalchemy import ForeignKey, create_engine, select, func, Row
+from sqlalchemy import create_engine, select, text, Row
 
-
-class Base(DeclarativeBase):
-    pass
-
-
-class PuzzleInfo(Base):
-    __tablename__: str = 'puzzle_info'
-
-    puzzle_id: Mapped[str] = mapped_column(primary_key=True)
-    rating: Mapped[int]
-    rating_deviation: Mapped[int]
-    themes: Mapped[str]
-
-    def __repr__(self) -> str:
-        return (
-            f'<PuzzleInfo(puzzle_id={self.puzzle_id}, '
-            f'rating={self.rating}, '
-            f'rating_deviation={self.rating_deviation}, '
-            f'themes={self.themes})>'
-        )
-
-
-class PuzzleMoves(Base):
-    __tablename__: str = 'puzzle_moves'
-
-    puzzle_id: Mapped[str] = mapped_column(
-        ForeignKey('puzzle_info.puzzle_id'), primary_key=True
-    )
-    fen: Mapped[str]
-    moves: Mapped[str]
-
-    def __repr__(self) -> str:
-        return (
-            f'<PuzzleMoves(puzzle_id={self.puzzle_id}, '
-            f'fen={self.fen}, '
-            f'moves={self.moves})>'
-        )
+from .puzzle_models import (
+    PuzzleInfo, PuzzleMoves, PuzzleOrder, Theme, PuzzleTheme, PuzzleGroup,
+    PuzzleCount, PuzzleCatalog
+)
+from .puzzle_migrations import PuzzleMigrator
 
 
 class PuzzleManager:
-    def __init__(self) -> None:
-        self.db_path = os.path.normpath(
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path = db_path or os.path.normpath(
             os.path.join(
                 os.path.dirname(__file__), '..', 'data', 'puzzles_db.db'
             )
         )
         self.engine = None
         self.session = None
+        self.db_file = None
+        self.data_version = None
+        self.generation = None
         self.rating_range = (None, None)
         self.puzzle_themes = None
+        self.theme_ids = None
+        self.ordinal_ranges = {}
+        self.rating_counts = {}
         self.initialize_session()
+        self.check_schema()
+        self.check_generation()
 
     def initialize_session(self) -> None:
         if self.session:
@@ -67,46 +45,268 @@ class PuzzleManager:
 
         self.engine = create_engine(f'sqlite:///{self.db_path}')
         self.session = Session(self.engine)
+        self.db_file = self.get_db_file()
+        self.data_version = None
+
+    def check_schema(self) -> None:
+        PuzzleMigrator(self.engine).check_schema()
+
+    def clear_caches(self) -> None:
+        self.ordinal_ranges = {}
+        self.rating_counts = {}
+        self.theme_ids = None
+        self.rating_range = (None, None)
+        self.puzzle_themes = None
+        self.session.expire_all()
+
+    def get_db_file(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def check_generation(self) -> None:
+        if self.get_db_file() != self.db_file:
+            self.initialize_session()
+            self.check_schema()
+            self.clear_caches()
+
+        data_version = self.session.execute(text('PRAGMA data_version')).scalar()
+        if data_version == self.data_version:
+            return
+        self.data_version = data_version
+        generation, is_stale = self.session.execute(
+            select(PuzzleCatalog.generation, PuzzleCatalog.is_stale)
+            .where(PuzzleCatalog.catalog_id == 0)
+        ).one()
+        if generation != self.generation:
+            self.generation = generation
+            self.clear_caches()
+        if is_stale:
+            self.data_version = None
+            raise RuntimeError(
+                f'The puzzles in {self.db_path} were changed outside the importer. '
+                f'Run "python -m data_managers migrate --rebuild" to rebuild the '
+                f'draw tables.'
+            )
+
+    def get_theme_id(self, theme: str) -> Optional[int]:
+        if self.theme_ids is None:
+            query = select(Theme.name, Theme.theme_id)
+            self.theme_ids = dict(self.session.execute(query).all())
+        return self.theme_ids.get(theme)
+
+    def get_ordinal_range(
+        self,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        theme_id: Optional[int] = None
+    ) -> Optional[Tuple[int, int]]:
+        key = (min_rating, max_rating, theme_id)
+        if key in self.ordinal_ranges:
+            return self.ordinal_ranges[key]
+
+        if theme_id is None:
+            ordinal_column, rating_column = PuzzleOrder.ordinal, PuzzleOrder.rating
+            first_query = select(ordinal_column)
+            last_query = select(ordinal_column)
+        else:
+            ordinal_column, rating_column = PuzzleTheme.position, PuzzleTheme.rating
+            first_query = select(ordinal_column).where(PuzzleTheme.theme_id == theme_id)
+            last_query = select(ordinal_column).where(PuzzleTheme.theme_id == theme_id)
+
+        if min_rating is not None and max_rating is not None:
+            first_query = first_query.where(rating_column >= min_rating)
+            last_query = last_query.where(rating_column <= max_rating)
+        first_query = first_query.order_by(rating_column, ordinal_column).limit(1)
+        last_query = (
+            last_query
+            .order_by(rating_column.desc(), ordinal_column.desc())
+            .limit(1)
+        )
+
+        first = self.session.execute(first_query).scalar()
+        last = self.session.execute(last_query).scalar()
+        if first is None or last is None or first > last:
+            ordinal_range = None
+        else:
+            ordinal_range = (first, last)
+        self.ordinal_ranges[key] = ordinal_range
+        return ordinal_range
 
     def get_puzzle(
         self,
         min_rating: Optional[int] = None,
         max_rating: Optional[int] = None,
-        theme: Optional[str] = None
+        theme: Optional[str] = None,
+        player_color: Optional[str] = None,
+        num_player_moves: Optional[int] = None
     ) -> Optional[Row[Tuple[PuzzleInfo, PuzzleMoves]]]:
+        self.check_generation()
+        theme_id = None
+        if theme is not None:
+            theme_id = self.get_theme_id(theme)
+            if theme_id is None:
+                return None
+        if player_color is not None or num_player_moves is not None:
+            return self.get_filtered_puzzle(
+                min_rating, max_rating, theme_id, player_color, num_player_moves
+            )
+
+        ordinal_range = self.get_ordinal_range(min_rating, max_rating, theme_id)
+        if ordinal_range is None:
+            return None
+        ordinal = random.randint(*ordinal_range)
+
+        if theme_id is None:
+            query = (
+                select(PuzzleInfo, PuzzleMoves)
+                .select_from(PuzzleOrder)
+                .join(PuzzleInfo, PuzzleOrder.puzzle_id == PuzzleInfo.puzzle_id)
+                .filter(PuzzleOrder.ordinal == ordinal)
+            )
+        else:
+            query = (
+                select(PuzzleInfo, PuzzleMoves)
+                .select_from(PuzzleTheme)
+                .join(PuzzleInfo, PuzzleTheme.puzzle_id == PuzzleInfo.puzzle_id)
+                .filter(
+                    PuzzleTheme.theme_id == theme_id,
+                    PuzzleTheme.position == ordinal
+                )
+            )
+        query = query.join(
+            PuzzleMoves, PuzzleInfo.puzzle_id == PuzzleMoves.puzzle_id
+        )
+
+        puzzle = self.session.execute(query).one_or_none()
+        return puzzle
+
+    def get_filtered_puzzle(
+        self,
+        min_rating: Optional[int],
+        max_rating: Optional[int],
+        theme_id: Optional[int],
+        player_color: Optional[str],
+        num_player_moves: Optional[int]
+    ) -> Optional[Row[Tuple[PuzzleInfo, PuzzleMoves]]]:
+        group_ranges = self.get_group_ranges(
+            min_rating, max_rating, theme_id, player_color, num_player_moves
+        )
+        count = sum(last - first for _, first, last in group_ranges)
+        if not count:
+            return None
+
+        index = random.randrange(count)
+        for (group_color, group_moves), first, last in group_ranges:
+            if index < last - first:
+                break
+            index -= last - first
         query = (
             select(PuzzleInfo, PuzzleMoves)
+            .select_from(PuzzleGroup)
+            .join(PuzzleInfo, PuzzleGroup.puzzle_id == PuzzleInfo.puzzle_id)
             .join(PuzzleMoves, PuzzleInfo.puzzle_id == PuzzleMoves.puzzle_id)
+            .where(
+                PuzzleGroup.theme_id == (-1 if theme_id is None else theme_id),
+                PuzzleGroup.player_color == group_color,
+                PuzzleGroup.num_player_moves == group_moves,
+                PuzzleGroup.position == first + index
+            )
         )
+        return self.session.execute(query).one_or_none()
 
-        if min_rating is not None and max_rating is not None:
-            query = query.filter(
-                PuzzleInfo.rating >= min_rating,
-                PuzzleInfo.rating <= max_rating
+    def get_rating_counts(
+        self, theme_id: int
+    ) -> Dict[Tuple[str, int], Tuple[List[int], List[int]]]:
+        if theme_id in self.rating_counts:
+            return self.rating_counts[theme_id]
+
+        query = (
+            select(
+                PuzzleCount.player_color, PuzzleCount.num_player_moves,
+                PuzzleCount.rating, PuzzleCount.count
             )
+            .where(PuzzleCount.theme_id == theme_id)
+            .order_by(
+                PuzzleCount.player_color, PuzzleCount.num_player_moves,
+                PuzzleCount.rating
+            )
+        )
+        histograms: Dict[Tuple[str, int], Tuple[List[int], List[int]]] = {}
+        for player_color, num_player_moves, rating, count in self.session.execute(query):
+            ratings, counts = histograms.setdefault(
+                (player_color, num_player_moves), ([], [])
+            )
+            ratings.append(rating)
+            counts.append(count)
+        self.rating_counts[theme_id] = {
+            group: (ratings, [0] + list(accumulate(counts)))
+            for group, (ratings, counts) in histograms.items()
+        }
+        return self.rating_counts[theme_id]
 
-        if theme is not None:
-            query = query.filter(PuzzleInfo.themes.contains(theme))
-        query = query.order_by(func.random()).limit(1)
+    def get_group_ranges(
+        self,
+        min_rating: Optional[int],
+        max_rating: Optional[int],
+        theme_id: Optional[int],
+        player_color: Optional[str],
+        num_player_moves: Optional[int]
+    ) -> List[Tuple[Tuple[str, int], int, int]]:
+        histograms = self.get_rating_counts(-1 if theme_id is None else theme_id)
+        group_ranges = []
+        for group, (ratings, prefix_counts) in histograms.items():
+            group_color, group_moves = group
+            if player_color is not None and group_color != player_color:
+                continue
+            if num_player_moves is not None and group_moves != num_player_moves:
+                continue
+            first, last = 0, len(ratings)
+            if min_rating is not None and max_rating is not None:
+                first = bisect_left(ratings, min_rating)
+                last = max(first, bisect_right(ratings, max_rating))
+            if prefix_counts[last] > prefix_counts[first]:
+                group_ranges.append((group, prefix_counts[first], prefix_counts[last]))
+        return group_ranges
 
-        puzzle = self.session.execute(query).one_or_none()
-        return puzzle
+    def get_puzzle_count(
+        self,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        theme: Optional[str] = None,
+        player_color: Optional[str] = None,
+        num_player_moves: Optional[int] = None
+    ) -> int:
+        self.check_generation()
+        theme_id = None
+        if theme is not None:
+            theme_id = self.get_theme_id(theme)
+            if theme_id is None:
+                return 0
+        group_ranges = self.get_group_ranges(
+            min_rating, max_rating, theme_id, player_color, num_player_moves
+        )
+        return sum(last - first for _, first, last in group_ranges)
     
+    def load_catalog(self) -> None:
+        query = (
+            select(PuzzleCatalog.min_rating, PuzzleCatalog.max_rating, PuzzleCatalog.themes)
+            .where(PuzzleCatalog.catalog_id == 0)
+        )
+        min_rating, max_rating, themes = self.session.execute(query).one()
+        self.rating_range = (min_rating, max_rating)
+        self.puzzle_themes = themes.split()
+
     def get_puzzle_themes(self) -> List[str]:
-        if self.puzzle_themes is not None:
-            return self.puzzle_themes
-        
-        query = select(PuzzleInfo.themes).distinct()
-        themes = self.session.execute(query).scalars().all()
-        unique = set([t for theme in themes for t in theme.split()])
-        self.puzzle_themes = sorted(unique)
+        self.check_generation()
+        if self.puzzle_themes is None:
+            self.load_catalog()
         return self.puzzle_themes
     
     def get_rating_range(self) -> Tuple[Optional[int], Optional[int]]:
-        if self.rating_range != (None, None):
-            return self.rating_range
-        
-        query = select(func.min(PuzzleInfo.rating), func.max(PuzzleInfo.rating))
-        result = self.session.execute(query).one_or_none()
-        self.rating_range = result
+        self.check_generation()
+        if self.puzzle_themes is None:
+            self.load_catalog()
         return self.rating_range
\ No newline at end of file
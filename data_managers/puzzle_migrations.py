@@ -0,0 +1,596 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import (
+    Connection, Engine, select, insert, update, delete, bindparam, inspect, func,
+    text, literal
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .puzzle_models import (
+    PuzzleInfo, PuzzleMoves, PuzzleOrder, Theme, PuzzleTheme, PuzzleGroup,
+    PuzzleCount, PuzzleCatalog
+)
+
+
+PuzzleState = Tuple[int, str, str, int]
+PuzzleGroupKey = Tuple[int, str, int]
+
+STALE_TRIGGERS = (
+    ('puzzle_info', 'INSERT'),
+    ('puzzle_info', 'DELETE'),
+    ('puzzle_info', 'UPDATE OF rating, themes, player_color, num_player_moves'),
+    ('puzzle_moves', 'INSERT'),
+    ('puzzle_moves', 'DELETE'),
+    ('puzzle_moves', 'UPDATE OF fen, moves'),
+    ('puzzle_theme', 'INSERT'),
+    ('puzzle_theme', 'DELETE'),
+    ('puzzle_theme', 'UPDATE'),
+)
+
+
+class PuzzleMigrator:
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.migrations: List[Callable[[Connection], None]] = [
+            self.add_content_hash,
+            self.add_packed_moves,
+            self.add_puzzle_metadata,
+            self.create_rating_indexes,
+            self.create_puzzle_order,
+            self.create_theme_index,
+            self.create_puzzle_groups,
+            self.create_puzzle_counts,
+            self.create_puzzle_catalog,
+        ]
+
+    @property
+    def latest_version(self) -> int:
+        return len(self.migrations)
+
+    def get_schema_version(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.exec_driver_sql('PRAGMA user_version').scalar()
+
+    def set_schema_version(self, connection: Connection, version: int) -> None:
+        connection.exec_driver_sql(f'PRAGMA user_version = {int(version)}')
+
+    def migrate(self, target_version: Optional[int] = None) -> int:
+        if not inspect(self.engine).has_table(PuzzleInfo.__tablename__):
+            return 0
+
+        target_version = (
+            self.latest_version if target_version is None else target_version
+        )
+        current_version = self.get_schema_version()
+        applied = 0
+        for version in range(current_version, target_version):
+            with self.engine.begin() as connection:
+                self.migrations[version](connection)
+                self.set_schema_version(connection, version + 1)
+            applied += 1
+
+        if applied:
+            with self.engine.begin() as connection:
+                self.bump_generation(connection)
+                connection.exec_driver_sql('ANALYZE')
+        return applied
+
+    def check_schema(self) -> None:
+        if not inspect(self.engine).has_table(PuzzleInfo.__tablename__):
+            raise RuntimeError(
+                f'{self.engine.url.database} contains no puzzles. Run '
+                f'"python -m data_managers import <csv_path>" to load them.'
+            )
+        version = self.get_schema_version()
+        if version == self.latest_version:
+            return
+        command = 'python -m data_managers migrate'
+        if version > self.latest_version:
+            command += ' --rebuild'
+        raise RuntimeError(
+            f'{self.engine.url.database} is at schema version {version}, but '
+            f'version {self.latest_version} is required. Run "{command}" to '
+            f'update it.'
+        )
+
+    def rebuild(self) -> int:
+        with self.engine.begin() as connection:
+            self.set_schema_version(connection, 0)
+        return self.migrate()
+
+    def create_puzzle_order(self, connection: Connection) -> None:
+        PuzzleOrder.__table__.drop(connection, checkfirst=True)
+        PuzzleOrder.__table__.create(connection)
+        ordinal = func.row_number().over(
+            order_by=(PuzzleInfo.rating, PuzzleInfo.puzzle_id)
+        ) - 1
+        query = insert(PuzzleOrder).from_select(
+            ['ordinal', 'puzzle_id', 'rating'],
+            select(ordinal, PuzzleInfo.puzzle_id, PuzzleInfo.rating)
+            .join(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+            .where(PuzzleInfo.player_color.is_not(None))
+        )
+        connection.execute(query)
+
+    def create_theme_index(self, connection: Connection) -> None:
+        PuzzleTheme.__table__.drop(connection, checkfirst=True)
+        Theme.__table__.drop(connection, checkfirst=True)
+        Theme.__table__.create(connection)
+        PuzzleTheme.__table__.create(connection)
+
+        query = (
+            select(PuzzleInfo.puzzle_id, PuzzleInfo.rating, PuzzleInfo.themes)
+            .join(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+            .where(PuzzleInfo.player_color.is_not(None))
+            .order_by(PuzzleInfo.rating, PuzzleInfo.puzzle_id)
+            .execution_options(yield_per=10000)
+        )
+        theme_ids = {}
+        positions = []
+        for partition in connection.execute(query).partitions():
+            batch = []
+            for puzzle_id, rating, themes in partition:
+                for theme in set(themes.split()):
+                    if theme not in theme_ids:
+                        theme_ids[theme] = len(theme_ids)
+                        positions.append(0)
+                    theme_id = theme_ids[theme]
+                    batch.append({
+                        'theme_id': theme_id,
+                        'position': positions[theme_id],
+                        'puzzle_id': puzzle_id,
+                        'rating': rating
+                    })
+                    positions[theme_id] += 1
+            connection.execute(insert(PuzzleTheme), batch)
+
+        if theme_ids:
+            connection.execute(
+                insert(Theme),
+                [
+                    {'theme_id': theme_id, 'name': theme}
+                    for theme, theme_id in theme_ids.items()
+                ]
+            )
+
+    def create_rating_indexes(self, connection: Connection) -> None:
+        connection.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_puzzle_info_rating_puzzle_id '
+            'ON puzzle_info (rating, puzzle_id)'
+        ))
+
+    def add_content_hash(self, connection: Connection) -> None:
+        columns = inspect(connection).get_columns(PuzzleInfo.__tablename__)
+        if 'content_hash' not in [column['name'] for column in columns]:
+            connection.execute(text(
+                'ALTER TABLE puzzle_info ADD COLUMN content_hash VARCHAR'
+            ))
+
+    def add_packed_moves(self, connection: Connection) -> None:
+        columns = inspect(connection).get_columns(PuzzleMoves.__tablename__)
+        if 'packed' not in [column['name'] for column in columns]:
+            connection.execute(text(
+                'ALTER TABLE puzzle_moves ADD COLUMN packed BLOB'
+            ))
+
+    def add_puzzle_metadata(self, connection: Connection) -> None:
+        columns = inspect(connection).get_columns(PuzzleInfo.__tablename__)
+        column_names = [column['name'] for column in columns]
+        for name, column_type in (
+            ('player_color', 'VARCHAR'),
+            ('num_moves', 'INTEGER'),
+            ('num_player_moves', 'INTEGER'),
+            ('piece_count', 'INTEGER')
+        ):
+            if name not in column_names:
+                connection.execute(text(
+                    f'ALTER TABLE puzzle_info ADD COLUMN {name} {column_type}'
+                ))
+
+        query = (
+            select(PuzzleMoves.puzzle_id, PuzzleMoves.fen, PuzzleMoves.moves)
+            .join(PuzzleInfo, PuzzleInfo.puzzle_id == PuzzleMoves.puzzle_id)
+            .where(
+                PuzzleInfo.player_color.is_(None),
+                PuzzleMoves.puzzle_id > bindparam('b_last_puzzle_id')
+            )
+            .order_by(PuzzleMoves.puzzle_id)
+            .limit(10000)
+        )
+        update_query = (
+            update(PuzzleInfo)
+            .where(PuzzleInfo.puzzle_id == bindparam('b_puzzle_id'))
+            .values(
+                player_color=bindparam('b_player_color'),
+                num_moves=bindparam('b_num_moves'),
+                num_player_moves=bindparam('b_num_player_moves'),
+                piece_count=bindparam('b_piece_count')
+            )
+        )
+        last_puzzle_id = ''
+        while True:
+            rows = connection.execute(
+                query, {'b_last_puzzle_id': last_puzzle_id}
+            ).all()
+            if not rows:
+                break
+            last_puzzle_id = rows[-1].puzzle_id
+            connection.execute(
+                update_query,
+                [
+                    {
+                        f'b_{name}': value
+                        for name, value in self.get_puzzle_metadata(fen, moves).items()
+                    } | {'b_puzzle_id': puzzle_id}
+                    for puzzle_id, fen, moves in rows
+                ]
+            )
+
+    def create_puzzle_counts(self, connection: Connection) -> None:
+        PuzzleCount.__table__.drop(connection, checkfirst=True)
+        PuzzleCount.__table__.create(connection)
+        columns = ['theme_id', 'player_color', 'num_player_moves', 'rating', 'count']
+        connection.execute(
+            insert(PuzzleCount).from_select(
+                columns,
+                select(
+                    literal(-1), PuzzleInfo.player_color,
+                    PuzzleInfo.num_player_moves, PuzzleInfo.rating, func.count()
+                )
+                .join(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+                .where(PuzzleInfo.player_color.is_not(None))
+                .group_by(
+                    PuzzleInfo.player_color, PuzzleInfo.num_player_moves,
+                    PuzzleInfo.rating
+                )
+            )
+        )
+        connection.execute(
+            insert(PuzzleCount).from_select(
+                columns,
+                select(
+                    PuzzleTheme.theme_id, PuzzleInfo.player_color,
+                    PuzzleInfo.num_player_moves, PuzzleTheme.rating, func.count()
+                )
+                .join(PuzzleInfo, PuzzleInfo.puzzle_id == PuzzleTheme.puzzle_id)
+                .where(PuzzleInfo.player_color.is_not(None))
+                .group_by(
+                    PuzzleTheme.theme_id, PuzzleInfo.player_color,
+                    PuzzleInfo.num_player_moves, PuzzleTheme.rating
+                )
+            )
+        )
+
+    def create_puzzle_groups(self, connection: Connection) -> None:
+        PuzzleGroup.__table__.drop(connection, checkfirst=True)
+        PuzzleGroup.__table__.create(connection)
+
+        theme_ids = dict(connection.execute(select(Theme.name, Theme.theme_id)).all())
+        query = (
+            select(
+                PuzzleInfo.puzzle_id, PuzzleInfo.rating, PuzzleInfo.themes,
+                PuzzleInfo.player_color, PuzzleInfo.num_player_moves
+            )
+            .join(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+            .where(PuzzleInfo.player_color.is_not(None))
+            .order_by(PuzzleInfo.rating, PuzzleInfo.puzzle_id)
+            .execution_options(yield_per=10000)
+        )
+        positions: Dict[Tuple[int, str, int], int] = {}
+        for partition in connection.execute(query).partitions():
+            batch = []
+            for puzzle_id, rating, themes, player_color, num_player_moves in partition:
+                theme_keys = [-1] + [
+                    theme_ids[theme] for theme in set(themes.split())
+                    if theme in theme_ids
+                ]
+                for theme_id in theme_keys:
+                    group = (theme_id, player_color, num_player_moves)
+                    position = positions.get(group, 0)
+                    batch.append({
+                        'theme_id': theme_id,
+                        'player_color': player_color,
+                        'num_player_moves': num_player_moves,
+                        'position': position,
+                        'puzzle_id': puzzle_id,
+                        'rating': rating
+                    })
+                    positions[group] = position + 1
+            connection.execute(insert(PuzzleGroup), batch)
+
+    def update_puzzles(
+        self, connection: Connection, previous: Dict[str, Optional[PuzzleState]]
+    ) -> None:
+        current = self.get_puzzle_states(connection, previous)
+        states = [
+            state for state in (*previous.values(), *current.values())
+            if state is not None
+        ]
+        if not states:
+            return
+
+        theme_ids = dict(connection.execute(select(Theme.name, Theme.theme_id)).all())
+        new_themes = sorted({
+            theme for _, themes, _, _ in current.values()
+            for theme in themes.split() if theme not in theme_ids
+        })
+        next_theme_id = max(theme_ids.values(), default=-1) + 1
+        for theme in new_themes:
+            theme_ids[theme] = next_theme_id
+            next_theme_id += 1
+        if new_themes:
+            connection.execute(
+                insert(Theme),
+                [{'theme_id': theme_ids[theme], 'name': theme} for theme in new_themes]
+            )
+
+        order_start = min(rating for rating, _, _, _ in states)
+        theme_starts: Dict[int, int] = {}
+        group_starts: Dict[PuzzleGroupKey, int] = {}
+        for rating, themes, player_color, num_player_moves in states:
+            for theme_id in self.get_theme_keys(themes, theme_ids):
+                if theme_id != -1:
+                    theme_starts[theme_id] = min(
+                        theme_starts.get(theme_id, rating), rating
+                    )
+                group = (theme_id, player_color, num_player_moves)
+                group_starts[group] = min(group_starts.get(group, rating), rating)
+
+        next_ordinal = self.truncate_puzzle_order(connection, order_start)
+        next_positions = {
+            theme_id: self.truncate_puzzle_theme(connection, theme_id, rating)
+            for theme_id, rating in theme_starts.items()
+        }
+        next_group_positions = {
+            group: self.truncate_puzzle_group(connection, group, rating)
+            for group, rating in group_starts.items()
+        }
+        self.update_puzzle_counts(connection, previous, current, theme_ids)
+
+        query = (
+            select(
+                PuzzleInfo.puzzle_id, PuzzleInfo.rating, PuzzleInfo.themes,
+                PuzzleInfo.player_color, PuzzleInfo.num_player_moves
+            )
+            .join(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+            .where(
+                PuzzleInfo.player_color.is_not(None),
+                PuzzleInfo.rating >= order_start
+            )
+            .order_by(PuzzleInfo.rating, PuzzleInfo.puzzle_id)
+            .execution_options(yield_per=10000)
+        )
+        for partition in connection.execute(query).partitions():
+            orders, positions, groups = [], [], []
+            for puzzle_id, rating, themes, player_color, num_player_moves in partition:
+                orders.append({
+                    'ordinal': next_ordinal, 'puzzle_id': puzzle_id, 'rating': rating
+                })
+                next_ordinal += 1
+                for theme_id in self.get_theme_keys(themes, theme_ids):
+                    if rating >= theme_starts.get(theme_id, rating + 1):
+                        positions.append({
+                            'theme_id': theme_id,
+                            'position': next_positions[theme_id],
+                            'puzzle_id': puzzle_id,
+                            'rating': rating
+                        })
+                        next_positions[theme_id] += 1
+                    group = (theme_id, player_color, num_player_moves)
+                    if rating >= group_starts.get(group, rating + 1):
+                        groups.append({
+                            'theme_id': theme_id,
+                            'player_color': player_color,
+                            'num_player_moves': num_player_moves,
+                            'position': next_group_positions[group],
+                            'puzzle_id': puzzle_id,
+                            'rating': rating
+                        })
+                        next_group_positions[group] += 1
+            for table, rows in (
+                (PuzzleOrder, orders), (PuzzleTheme, positions), (PuzzleGroup, groups)
+            ):
+                if rows:
+                    connection.execute(insert(table), rows)
+
+        empty_themes = [
+            theme_id for theme_id, position in next_positions.items() if not position
+        ]
+        if empty_themes:
+            connection.execute(delete(Theme).where(Theme.theme_id.in_(empty_themes)))
+
+    def get_puzzle_states(
+        self, connection: Connection, puzzle_ids: Iterable[str]
+    ) -> Dict[str, PuzzleState]:
+        puzzle_ids = list(puzzle_ids)
+        states = {}
+        for start in range(0, len(puzzle_ids), 500):
+            query = (
+                select(
+                    PuzzleInfo.puzzle_id, PuzzleInfo.rating, PuzzleInfo.themes,
+                    PuzzleInfo.player_color, PuzzleInfo.num_player_moves
+                )
+                .join(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+                .where(
+                    PuzzleInfo.player_color.is_not(None),
+                    PuzzleInfo.puzzle_id.in_(puzzle_ids[start:start + 500])
+                )
+            )
+            for puzzle_id, *state in connection.execute(query):
+                states[puzzle_id] = tuple(state)
+        return states
+
+    @staticmethod
+    def get_theme_keys(themes: str, theme_ids: Dict[str, int]) -> List[int]:
+        return [-1] + [
+            theme_ids[theme] for theme in set(themes.split()) if theme in theme_ids
+        ]
+
+    def truncate_puzzle_order(self, connection: Connection, rating: int) -> int:
+        first = connection.execute(
+            select(func.min(PuzzleOrder.ordinal)).where(PuzzleOrder.rating >= rating)
+        ).scalar()
+        if first is None:
+            return connection.execute(select(func.count()).select_from(PuzzleOrder)).scalar()
+        connection.execute(delete(PuzzleOrder).where(PuzzleOrder.ordinal >= first))
+        return first
+
+    def truncate_puzzle_theme(
+        self, connection: Connection, theme_id: int, rating: int
+    ) -> int:
+        first = connection.execute(
+            select(func.min(PuzzleTheme.position))
+            .where(PuzzleTheme.theme_id == theme_id, PuzzleTheme.rating >= rating)
+        ).scalar()
+        if first is None:
+            return connection.execute(
+                select(func.count()).where(PuzzleTheme.theme_id == theme_id)
+            ).scalar()
+        connection.execute(
+            delete(PuzzleTheme)
+            .where(PuzzleTheme.theme_id == theme_id, PuzzleTheme.position >= first)
+        )
+        return first
+
+    def truncate_puzzle_group(
+        self, connection: Connection, group: PuzzleGroupKey, rating: int
+    ) -> int:
+        theme_id, player_color, num_player_moves = group
+        first = connection.execute(
+            select(func.coalesce(func.sum(PuzzleCount.count), 0))
+            .where(
+                PuzzleCount.theme_id == theme_id,
+                PuzzleCount.player_color == player_color,
+                PuzzleCount.num_player_moves == num_player_moves,
+                PuzzleCount.rating < rating
+            )
+        ).scalar()
+        connection.execute(
+            delete(PuzzleGroup)
+            .where(
+                PuzzleGroup.theme_id == theme_id,
+                PuzzleGroup.player_color == player_color,
+                PuzzleGroup.num_player_moves == num_player_moves,
+                PuzzleGroup.position >= first
+            )
+        )
+        return first
+
+    def update_puzzle_counts(
+        self,
+        connection: Connection,
+        previous: Dict[str, Optional[PuzzleState]],
+        current: Dict[str, PuzzleState],
+        theme_ids: Dict[str, int]
+    ) -> None:
+        deltas: Dict[Tuple[int, str, int, int], int] = {}
+        for states, change in ((previous.values(), -1), (current.values(), 1)):
+            for state in states:
+                if state is None:
+                    continue
+                rating, themes, player_color, num_player_moves = state
+                for theme_id in self.get_theme_keys(themes, theme_ids):
+                    key = (theme_id, player_color, num_player_moves, rating)
+                    deltas[key] = deltas.get(key, 0) + change
+
+        rows = [
+            {
+                'theme_id': theme_id,
+                'player_color': player_color,
+                'num_player_moves': num_player_moves,
+                'rating': rating,
+                'count': change
+            }
+            for (theme_id, player_color, num_player_moves, rating), change
+            in deltas.items() if change
+        ]
+        if not rows:
+            return
+        query = sqlite_insert(PuzzleCount)
+        query = query.on_conflict_do_update(
+            index_elements=[
+                PuzzleCount.theme_id, PuzzleCount.player_color,
+                PuzzleCount.num_player_moves, PuzzleCount.rating
+            ],
+            set_={'count': PuzzleCount.count + query.excluded.count}
+        )
+        connection.execute(query, rows)
+        connection.execute(delete(PuzzleCount).where(PuzzleCount.count <= 0))
+
+    def create_puzzle_catalog(self, connection: Connection) -> None:
+        generation = self.get_generation(connection)
+        PuzzleCatalog.__table__.drop(connection, checkfirst=True)
+        PuzzleCatalog.__table__.create(connection)
+        self.write_catalog(connection, generation)
+        self.create_stale_triggers(connection)
+
+    def create_stale_triggers(self, connection: Connection) -> None:
+        for table, event in STALE_TRIGGERS:
+            name = f'mark_catalog_stale_after_{table}_{event.split()[0].lower()}'
+            connection.execute(text(
+                f'CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} '
+                f'BEGIN '
+                f'UPDATE puzzle_catalog SET is_stale = 1, generation = generation + 1 '
+                f'WHERE catalog_id = 0 AND is_stale = 0; '
+                f'END'
+            ))
+
+    def get_generation(self, connection: Connection) -> Optional[int]:
+        inspector = inspect(connection)
+        if not inspector.has_table(PuzzleCatalog.__tablename__):
+            return None
+        columns = inspector.get_columns(PuzzleCatalog.__tablename__)
+        if 'generation' not in [column['name'] for column in columns]:
+            return None
+        return connection.execute(
+            select(PuzzleCatalog.generation).where(PuzzleCatalog.catalog_id == 0)
+        ).scalar()
+
+    def bump_generation(self, connection: Connection) -> None:
+        if self.get_generation(connection) is not None:
+            connection.execute(
+                update(PuzzleCatalog)
+                .where(PuzzleCatalog.catalog_id == 0)
+                .values(generation=PuzzleCatalog.generation + 1)
+            )
+
+    def write_catalog(
+        self, connection: Connection, generation: Optional[int] = None
+    ) -> None:
+        if generation is None:
+            generation = self.get_generation(connection)
+        min_rating, max_rating = connection.execute(
+            select(func.min(PuzzleOrder.rating), func.max(PuzzleOrder.rating))
+        ).one()
+        themes = list(
+            connection.execute(select(Theme.name).order_by(Theme.name)).scalars()
+        )
+        connection.execute(
+            insert(PuzzleCatalog).prefix_with('OR REPLACE'),
+            {
+                'catalog_id': 0,
+                'min_rating': min_rating,
+                'max_rating': max_rating,
+                'themes': ' '.join(themes),
+                'generation': (generation or 0) + 1,
+                'is_stale': False
+            }
+        )
+
+    @staticmethod
+    def get_puzzle_metadata(fen: str, moves: str) -> Dict[str, Any]:
+        fields = fen.split(maxsplit=2)
+        num_moves = len(moves.split())
+        if len(fields) < 2 or fields[1] not in ('w', 'b'):
+            return {
+                'player_color': None,
+                'num_moves': num_moves,
+                'num_player_moves': None,
+                'piece_count': None
+            }
+        placement, turn = fields[:2]
+        return {
+            'player_color': 'b' if turn == 'w' else 'w',
+            'num_moves': num_moves,
+            'num_player_moves': num_moves // 2,
+            'piece_count': sum(char.isalpha() for char in placement)
+        }
\ No newline at end of file
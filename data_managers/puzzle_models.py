@@ -0,0 +1,167 @@
+from typing import Optional
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy import ForeignKey, Index
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class PuzzleInfo(Base):
+    __tablename__: str = 'puzzle_info'
+
+    puzzle_id: Mapped[str] = mapped_column(primary_key=True)
+    rating: Mapped[int]
+    rating_deviation: Mapped[int]
+    themes: Mapped[str]
+    content_hash: Mapped[Optional[str]]
+    player_color: Mapped[Optional[str]]
+    num_moves: Mapped[Optional[int]]
+    num_player_moves: Mapped[Optional[int]]
+    piece_count: Mapped[Optional[int]]
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleInfo(puzzle_id={self.puzzle_id}, '
+            f'rating={self.rating}, '
+            f'rating_deviation={self.rating_deviation}, '
+            f'themes={self.themes})>'
+        )
+
+
+class PuzzleMoves(Base):
+    __tablename__: str = 'puzzle_moves'
+
+    puzzle_id: Mapped[str] = mapped_column(
+        ForeignKey('puzzle_info.puzzle_id'), primary_key=True
+    )
+    fen: Mapped[str]
+    moves: Mapped[str]
+    packed: Mapped[Optional[bytes]]
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleMoves(puzzle_id={self.puzzle_id}, '
+            f'fen={self.fen}, '
+            f'moves={self.moves})>'
+        )
+
+
+class PuzzleOrder(Base):
+    __tablename__: str = 'puzzle_order'
+
+    ordinal: Mapped[int] = mapped_column(primary_key=True)
+    puzzle_id: Mapped[str] = mapped_column(ForeignKey('puzzle_info.puzzle_id'))
+    rating: Mapped[int] = mapped_column(index=True)
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleOrder(ordinal={self.ordinal}, '
+            f'puzzle_id={self.puzzle_id}, '
+            f'rating={self.rating})>'
+        )
+
+
+class Theme(Base):
+    __tablename__: str = 'theme'
+
+    theme_id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(unique=True)
+
+    def __repr__(self) -> str:
+        return f'<Theme(theme_id={self.theme_id}, name={self.name})>'
+
+
+class PuzzleTheme(Base):
+    __tablename__: str = 'puzzle_theme'
+    __table_args__ = (
+        Index('ix_puzzle_theme_theme_id_rating', 'theme_id', 'rating', 'position'),
+    )
+
+    theme_id: Mapped[int] = mapped_column(
+        ForeignKey('theme.theme_id'), primary_key=True
+    )
+    position: Mapped[int] = mapped_column(primary_key=True)
+    puzzle_id: Mapped[str] = mapped_column(ForeignKey('puzzle_info.puzzle_id'))
+    rating: Mapped[int]
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleTheme(theme_id={self.theme_id}, '
+            f'position={self.position}, '
+            f'puzzle_id={self.puzzle_id}, '
+            f'rating={self.rating})>'
+        )
+
+
+class PuzzleGroup(Base):
+    __tablename__: str = 'puzzle_group'
+
+    theme_id: Mapped[int] = mapped_column(primary_key=True)
+    player_color: Mapped[str] = mapped_column(primary_key=True)
+    num_player_moves: Mapped[int] = mapped_column(primary_key=True)
+    position: Mapped[int] = mapped_column(primary_key=True)
+    puzzle_id: Mapped[str] = mapped_column(ForeignKey('puzzle_info.puzzle_id'))
+    rating: Mapped[int]
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleGroup(theme_id={self.theme_id}, '
+            f'player_color={self.player_color}, '
+            f'num_player_moves={self.num_player_moves}, '
+            f'position={self.position}, '
+            f'puzzle_id={self.puzzle_id})>'
+        )
+
+
+class PuzzleQuarantine(Base):
+    __tablename__: str = 'puzzle_quarantine'
+
+    puzzle_id: Mapped[str] = mapped_column(primary_key=True)
+    reason: Mapped[str]
+    fen: Mapped[Optional[str]]
+    moves: Mapped[Optional[str]]
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleQuarantine(puzzle_id={self.puzzle_id}, '
+            f'reason={self.reason})>'
+        )
+
+
+class PuzzleCount(Base):
+    __tablename__: str = 'puzzle_count'
+
+    theme_id: Mapped[int] = mapped_column(primary_key=True)
+    player_color: Mapped[str] = mapped_column(primary_key=True)
+    num_player_moves: Mapped[int] = mapped_column(primary_key=True)
+    rating: Mapped[int] = mapped_column(primary_key=True)
+    count: Mapped[int]
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleCount(theme_id={self.theme_id}, '
+            f'player_color={self.player_color}, '
+            f'num_player_moves={self.num_player_moves}, '
+            f'rating={self.rating}, '
+            f'count={self.count})>'
+        )
+
+
+class PuzzleCatalog(Base):
+    __tablename__: str = 'puzzle_catalog'
+
+    catalog_id: Mapped[int] = mapped_column(primary_key=True)
+    min_rating: Mapped[Optional[int]]
+    max_rating: Mapped[Optional[int]]
+    themes: Mapped[str]
+    generation: Mapped[int] = mapped_column(default=0)
+    is_stale: Mapped[bool] = mapped_column(default=False)
+
+    def __repr__(self) -> str:
+        return (
+            f'<PuzzleCatalog(generation={self.generation}, '
+            f'is_stale={self.is_stale}, '
+            f'min_rating={self.min_rating}, '
+            f'max_rating={self.max_rating})>'
+        )
\ No newline at end of file
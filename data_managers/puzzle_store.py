@@ -0,0 +1,335 @@
+import os
+import sys
+import mmap
+import time
+import array
+import random
+import struct
+import chess
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import (
+    BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+)
+from sqlalchemy import create_engine, select
+
+from .puzzle_models import PuzzleInfo, PuzzleMoves
+from .puzzle_migrations import PuzzleMigrator
+from .puzzle_codec import PuzzleCodec
+
+
+DEFAULT_STORE_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'puzzles_db.store')
+)
+
+
+class StoredPuzzle(NamedTuple):
+    puzzle_id: str
+    rating: int
+    rating_deviation: int
+    themes: str
+    player_color: str
+    num_moves: int
+    num_player_moves: int
+    piece_count: int
+    board: chess.Board
+    moves: List[str]
+
+
+class PuzzleStoreFormat:
+    magic = b'CXPSTORE'
+    version = 2
+    header = struct.Struct('<8sIIIQQQQQ')
+    record = struct.Struct('<QHHBHHBB')
+    theme_entry = struct.Struct('<QIH')
+
+
+class PuzzleStoreBuilder:
+    def __init__(
+        self,
+        db_path: str,
+        store_path: Optional[str] = None,
+        batch_size: int = 10000
+    ) -> None:
+        self.db_path = db_path
+        self.store_path = store_path or DEFAULT_STORE_PATH
+        self.batch_size = batch_size
+
+    def build(self) -> Dict[str, int]:
+        start_time = time.perf_counter()
+        codec = PuzzleCodec()
+        failures: Dict[str, str] = {}
+        ratings = array.array('H')
+        traits = array.array('B')
+        records = bytearray()
+        theme_positions: Dict[str, array.array] = {}
+
+        engine = create_engine(f'sqlite:///{self.db_path}')
+        PuzzleMigrator(engine).migrate()
+        query = (
+            select(
+                PuzzleInfo.puzzle_id, PuzzleInfo.rating,
+                PuzzleInfo.rating_deviation, PuzzleInfo.themes,
+                PuzzleInfo.player_color, PuzzleInfo.num_moves,
+                PuzzleInfo.num_player_moves, PuzzleInfo.piece_count,
+                PuzzleMoves.fen, PuzzleMoves.moves, PuzzleMoves.packed
+            )
+            .join(PuzzleMoves, PuzzleInfo.puzzle_id == PuzzleMoves.puzzle_id)
+            .where(
+                PuzzleInfo.player_color.is_not(None),
+                PuzzleInfo.num_moves.is_not(None),
+                PuzzleInfo.num_player_moves.is_not(None),
+                PuzzleInfo.piece_count.is_not(None)
+            )
+            .order_by(PuzzleInfo.rating, PuzzleInfo.puzzle_id)
+            .execution_options(yield_per=self.batch_size)
+        )
+
+        temporary_path = f'{self.store_path}.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(bytes(PuzzleStoreFormat.header.size))
+            blob_offset = file.tell()
+            with engine.connect() as connection:
+                for (
+                    puzzle_id, rating, rating_deviation, themes,
+                    player_color, num_moves, num_player_moves, piece_count,
+                    fen, moves, packed
+                ) in connection.execute(query):
+                    if packed is None:
+                        try:
+                            packed = codec.encode(fen, moves)
+                        except (ValueError, struct.error) as error:
+                            failures[puzzle_id] = str(error)
+                            continue
+                    index = len(ratings)
+                    puzzle_id_bytes = puzzle_id.encode()
+                    themes_bytes = themes.encode()
+                    records += PuzzleStoreFormat.record.pack(
+                        file.tell(), rating, rating_deviation,
+                        len(puzzle_id_bytes), len(themes_bytes), len(packed),
+                        min(num_moves, 255), piece_count
+                    )
+                    file.write(puzzle_id_bytes)
+                    file.write(themes_bytes)
+                    file.write(packed)
+                    ratings.append(rating)
+                    traits.append(self.get_traits(player_color, num_player_moves))
+                    for theme in set(themes.split()):
+                        theme_positions.setdefault(theme, array.array('I')).append(index)
+            engine.dispose()
+
+            ratings_offset = file.tell()
+            self.write_array(file, ratings)
+            traits_offset = file.tell()
+            self.write_array(file, traits)
+            records_offset = file.tell()
+            file.write(records)
+
+            theme_entries = bytearray()
+            for theme in sorted(theme_positions):
+                positions = theme_positions[theme]
+                positions_offset = file.tell()
+                self.write_array(file, positions)
+                theme_bytes = theme.encode()
+                theme_entries += PuzzleStoreFormat.theme_entry.pack(
+                    positions_offset, len(positions), len(theme_bytes)
+                ) + theme_bytes
+            themes_offset = file.tell()
+            file.write(theme_entries)
+
+            file.seek(0)
+            file.write(PuzzleStoreFormat.header.pack(
+                PuzzleStoreFormat.magic, PuzzleStoreFormat.version,
+                len(ratings), len(theme_positions),
+                blob_offset, ratings_offset, traits_offset,
+                records_offset, themes_offset
+            ))
+        os.replace(temporary_path, self.store_path)
+
+        elapsed = time.perf_counter() - start_time
+        print(
+            f'Wrote {len(ratings)} puzzles and {len(theme_positions)} themes '
+            f'to {self.store_path} in {elapsed:.1f}s'
+        )
+        if failures:
+            print(
+                f'Skipped {len(failures)} puzzles because they could not be '
+                f'encoded (run validate --quarantine to move them aside):'
+            )
+            for puzzle_id, error in sorted(failures.items())[:20]:
+                print(f'{puzzle_id}: {error}')
+        return {'written': len(ratings), 'skipped': len(failures)}
+
+    @staticmethod
+    def get_traits(player_color: str, num_player_moves: int) -> int:
+        return (0x80 if player_color == 'b' else 0) | min(num_player_moves, 0x7F)
+
+    def write_array(self, file: BinaryIO, values: array.array) -> None:
+        if sys.byteorder != 'little':
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        values.tofile(file)
+
+
+class PuzzleStore:
+    def __init__(self, store_path: Optional[str] = None) -> None:
+        if sys.byteorder != 'little':
+            raise RuntimeError('The puzzle store requires a little-endian platform')
+        self.store_path = store_path or DEFAULT_STORE_PATH
+        self.file = open(self.store_path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.buffer)
+        self.codec = PuzzleCodec()
+        self.filtered_positions: OrderedDict[Tuple, array.array] = OrderedDict()
+        self.filtered_positions_size = 16
+        self.initialize_tables()
+
+    def initialize_tables(self) -> None:
+        (
+            magic, version, puzzle_count, theme_count,
+            _, ratings_offset, traits_offset, self.records_offset, themes_offset
+        ) = PuzzleStoreFormat.header.unpack_from(self.buffer)
+        if magic != PuzzleStoreFormat.magic or version != PuzzleStoreFormat.version:
+            raise ValueError(
+                f'{self.store_path} is not a version '
+                f'{PuzzleStoreFormat.version} puzzle store'
+            )
+
+        self.ratings = self.view[
+            ratings_offset:ratings_offset + 2 * puzzle_count
+        ].cast('H')
+        self.traits = self.view[traits_offset:traits_offset + puzzle_count]
+        self.theme_positions = {}
+        offset = themes_offset
+        for _ in range(theme_count):
+            positions_offset, count, name_length = (
+                PuzzleStoreFormat.theme_entry.unpack_from(self.buffer, offset)
+            )
+            offset += PuzzleStoreFormat.theme_entry.size
+            theme = bytes(self.buffer[offset:offset + name_length]).decode()
+            offset += name_length
+            self.theme_positions[theme] = self.view[
+                positions_offset:positions_offset + 4 * count
+            ].cast('I')
+        self.puzzle_themes = sorted(self.theme_positions)
+
+    def close(self) -> None:
+        for positions in self.theme_positions.values():
+            positions.release()
+        self.ratings.release()
+        self.traits.release()
+        self.view.release()
+        self.buffer.close()
+        self.file.close()
+
+    def get_puzzle(
+        self,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        theme: Optional[str] = None,
+        player_color: Optional[str] = None,
+        num_player_moves: Optional[int] = None
+    ) -> Optional[StoredPuzzle]:
+        candidates = self.get_candidates(
+            min_rating, max_rating, theme, player_color, num_player_moves
+        )
+        if not candidates:
+            return None
+        return self.read_puzzle(candidates[random.randrange(len(candidates))])
+
+    def get_puzzle_count(
+        self,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        theme: Optional[str] = None,
+        player_color: Optional[str] = None,
+        num_player_moves: Optional[int] = None
+    ) -> int:
+        return len(self.get_candidates(
+            min_rating, max_rating, theme, player_color, num_player_moves
+        ))
+
+    def get_candidates(
+        self,
+        min_rating: Optional[int],
+        max_rating: Optional[int],
+        theme: Optional[str],
+        player_color: Optional[str],
+        num_player_moves: Optional[int]
+    ) -> Sequence[int]:
+        if theme is None:
+            positions, key = range(len(self.ratings)), self.ratings.__getitem__
+        else:
+            positions = self.theme_positions.get(theme)
+            if positions is None:
+                return ()
+            key = self.ratings.__getitem__
+
+        first, last = 0, len(positions)
+        if min_rating is not None and max_rating is not None:
+            first = bisect_left(positions, min_rating, key=key)
+            last = max(first, bisect_right(positions, max_rating, key=key))
+        positions = positions[first:last]
+        if player_color is None and num_player_moves is None:
+            return positions
+
+        filter_key = (theme, first, last, player_color, num_player_moves)
+        candidates = self.filtered_positions.get(filter_key)
+        if candidates is None:
+            candidates = self.filter_positions(
+                positions, player_color, num_player_moves
+            )
+            if len(self.filtered_positions) >= self.filtered_positions_size:
+                self.filtered_positions.popitem(last=False)
+            self.filtered_positions[filter_key] = candidates
+        else:
+            self.filtered_positions.move_to_end(filter_key)
+        return candidates
+
+    def filter_positions(
+        self,
+        positions: Iterable[int],
+        player_color: Optional[str],
+        num_player_moves: Optional[int]
+    ) -> array.array:
+        traits = self.traits
+        if num_player_moves is None:
+            color_bit = 0x80 if player_color == 'b' else 0
+            return array.array(
+                'I', (i for i in positions if traits[i] & 0x80 == color_bit)
+            )
+        if player_color is None:
+            return array.array(
+                'I', (i for i in positions if traits[i] & 0x7F == num_player_moves)
+            )
+        wanted = PuzzleStoreBuilder.get_traits(player_color, num_player_moves)
+        return array.array('I', (i for i in positions if traits[i] == wanted))
+
+    def read_puzzle(self, index: int) -> StoredPuzzle:
+        (
+            offset, rating, rating_deviation,
+            puzzle_id_length, themes_length, packed_length,
+            num_moves, piece_count
+        ) = PuzzleStoreFormat.record.unpack_from(
+            self.buffer, self.records_offset + index * PuzzleStoreFormat.record.size
+        )
+        puzzle_id = bytes(self.buffer[offset:offset + puzzle_id_length]).decode()
+        offset += puzzle_id_length
+        themes = bytes(self.buffer[offset:offset + themes_length]).decode()
+        offset += themes_length
+        board, moves = self.codec.decode(self.buffer[offset:offset + packed_length])
+        traits = self.traits[index]
+        return StoredPuzzle(
+            puzzle_id, rating, rating_deviation, themes,
+            'b' if traits & 0x80 else 'w', num_moves, traits & 0x7F, piece_count,
+            board, moves
+        )
+
+    def get_puzzle_themes(self) -> List[str]:
+        return self.puzzle_themes
+
+    def get_rating_range(self) -> Tuple[Optional[int], Optional[int]]:
+        if not self.ratings:
+            return None, None
+        return self.ratings[0], self.ratings[-1]
@@ -0,0 +1,186 @@
+import os
+import csv
+import time
+import chess
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import (
+    Engine, create_engine, select, insert, delete, func, literal_column
+)
+
+from .puzzle_models import PuzzleInfo, PuzzleMoves, PuzzleQuarantine
+from .puzzle_migrations import PuzzleMigrator
+from .puzzle_codec import PuzzleCodec
+
+
+worker_engine: Optional[Engine] = None
+moves_rowid = literal_column('puzzle_moves.rowid')
+
+
+def initialize_worker(db_path: str) -> None:
+    global worker_engine
+    worker_engine = create_engine(f'sqlite:///file:{db_path}?mode=ro&uri=true')
+
+
+def validate_rowid_range(first_rowid: int, last_rowid: int) -> List[Tuple[str, str]]:
+    codec = PuzzleCodec()
+    query = (
+        select(
+            PuzzleMoves.puzzle_id, PuzzleMoves.fen, PuzzleMoves.moves,
+            PuzzleMoves.packed, PuzzleInfo.puzzle_id
+        )
+        .outerjoin(PuzzleInfo, PuzzleInfo.puzzle_id == PuzzleMoves.puzzle_id)
+        .where(moves_rowid.between(first_rowid, last_rowid))
+    )
+    problems = []
+    with worker_engine.connect() as connection:
+        for puzzle_id, fen, moves, packed, info_id in connection.execute(query):
+            problem = validate_puzzle(codec, fen, moves, packed, info_id is not None)
+            if problem is not None:
+                problems.append((puzzle_id, problem))
+    return problems
+
+
+def validate_puzzle(
+    codec: PuzzleCodec,
+    fen: str,
+    moves: str,
+    packed: Optional[bytes],
+    has_info: bool
+) -> Optional[str]:
+    if not has_info:
+        return 'missing puzzle_info row'
+    try:
+        board = chess.Board(fen)
+    except ValueError:
+        return f'unparseable FEN {fen!r}'
+    if not board.is_valid():
+        return f'invalid position ({board.status()!r})'
+
+    uci_moves = moves.split()
+    if len(uci_moves) < 2 or len(uci_moves) % 2:
+        return f'expected an even number of moves, got {len(uci_moves)}'
+    for index, uci_move in enumerate(uci_moves):
+        try:
+            move = chess.Move.from_uci(uci_move)
+        except ValueError:
+            return f'unparseable move {index + 1} {uci_move!r}'
+        if not board.is_legal(move):
+            return f'illegal move {index + 1} {uci_move!r}'
+        board.push(move)
+
+    if packed is not None and packed != codec.encode(fen, moves):
+        return 'packed encoding does not match fen and moves'
+    return None
+
+
+class PuzzleValidator:
+    def __init__(
+        self,
+        db_path: str,
+        chunk_size: int = 20000,
+        workers: Optional[int] = None
+    ) -> None:
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+
+    def get_rowid_ranges(self, engine: Engine) -> Iterator[Tuple[int, int]]:
+        with engine.connect() as connection:
+            first_rowid, last_rowid = connection.execute(
+                select(func.min(moves_rowid), func.max(moves_rowid))
+                .select_from(PuzzleMoves)
+            ).one()
+        if first_rowid is None:
+            return
+        for start in range(first_rowid, last_rowid + 1, self.chunk_size):
+            yield start, min(start + self.chunk_size - 1, last_rowid)
+
+    def get_orphaned_info(self, engine: Engine) -> List[Tuple[str, str]]:
+        query = (
+            select(PuzzleInfo.puzzle_id)
+            .outerjoin(PuzzleMoves, PuzzleMoves.puzzle_id == PuzzleInfo.puzzle_id)
+            .where(PuzzleMoves.puzzle_id.is_(None))
+        )
+        with engine.connect() as connection:
+            return [
+                (puzzle_id, 'missing puzzle_moves row')
+                for puzzle_id in connection.execute(query).scalars()
+            ]
+
+    def validate(
+        self,
+        report_path: Optional[str] = None,
+        quarantine: bool = False
+    ) -> Dict[str, str]:
+        start_time = time.perf_counter()
+        engine = create_engine(f'sqlite:///{self.db_path}')
+        PuzzleMigrator(engine).migrate()
+
+        problems = dict(self.get_orphaned_info(engine))
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=initialize_worker,
+            initargs=(self.db_path,)
+        ) as executor:
+            ranges = list(self.get_rowid_ranges(engine))
+            for chunk_problems in executor.map(
+                validate_rowid_range,
+                [first_rowid for first_rowid, _ in ranges],
+                [last_rowid for _, last_rowid in ranges]
+            ):
+                problems.update(chunk_problems)
+
+        if report_path is not None:
+            self.write_report(report_path, problems)
+        if quarantine and problems:
+            self.quarantine_puzzles(engine, problems)
+        engine.dispose()
+
+        elapsed = time.perf_counter() - start_time
+        print(
+            f'Found {len(problems)} invalid puzzles in {elapsed:.1f}s '
+            f'using {self.workers} workers'
+        )
+        return problems
+
+    def write_report(self, report_path: str, problems: Dict[str, str]) -> None:
+        with open(report_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('PuzzleId', 'Problem'))
+            writer.writerows(sorted(problems.items()))
+
+    def quarantine_puzzles(self, engine: Engine, problems: Dict[str, str]) -> None:
+        puzzle_ids = list(problems)
+        with engine.begin() as connection:
+            PuzzleQuarantine.__table__.create(connection, checkfirst=True)
+            for start in range(0, len(puzzle_ids), 500):
+                batch = puzzle_ids[start:start + 500]
+                query = (
+                    select(PuzzleMoves.puzzle_id, PuzzleMoves.fen, PuzzleMoves.moves)
+                    .where(PuzzleMoves.puzzle_id.in_(batch))
+                )
+                moves = {
+                    puzzle_id: (fen, uci_moves)
+                    for puzzle_id, fen, uci_moves in connection.execute(query)
+                }
+                connection.execute(
+                    insert(PuzzleQuarantine).prefix_with('OR REPLACE'),
+                    [
+                        {
+                            'puzzle_id': puzzle_id,
+                            'reason': problems[puzzle_id],
+                            'fen': moves.get(puzzle_id, (None, None))[0],
+                            'moves': moves.get(puzzle_id, (None, None))[1]
+                        }
+                        for puzzle_id in batch
+                    ]
+                )
+                connection.execute(
+                    delete(PuzzleMoves).where(PuzzleMoves.puzzle_id.in_(batch))
+                )
+                connection.execute(
+                    delete(PuzzleInfo).where(PuzzleInfo.puzzle_id.in_(batch))
+                )
+        PuzzleMigrator(engine).rebuild()
@@ -1,9 +1,11 @@
 import os
+import json
 
-from typing import Optional, Tuple, Sequence
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.orm.session import Session
 from sqlalchemy import ForeignKey, create_engine, select, update, delete
+from sqlalchemy.dialects.sqlite import insert
 
 
 class Base(DeclarativeBase):
@@ -48,16 +50,33 @@ class UserThemeStatistics(Base):
     puzzles_solved: Mapped[int]
 
 
+class UserJournalState(Base):
+    __tablename__: str = 'user_journal_state'
+
+    journal_id: Mapped[int] = mapped_column(primary_key=True)
+    last_sequence: Mapped[int]
+
+
+ThemeStatistics = Tuple[str, int, float]
+
+
 class UserDataManager:
-    def __init__(self) -> None:
-        self.db_path = os.path.normpath(
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path = db_path or os.path.normpath(
             os.path.join(
                 os.path.dirname(__file__), '..', 'data', 'users_db.db'
             )
         )
+        self.journal_path = f'{self.db_path}-journal.jsonl'
         self.engine = None
         self.session = None
+        self.journal_file = None
+        self.pending_results = []
+        self.sequence = 0
+        self.flush_threshold = 20
+        self.theme_statistics_cache = {}
         self.initialize_session()
+        self.initialize_journal()
 
     def initialize_session(self) -> None:
         if self.session:
@@ -68,7 +87,40 @@ class UserDataManager:
             self.engine = None
 
         self.engine = create_engine(f'sqlite:///{self.db_path}')
-        self.session = Session(self.engine)
+        self.session = Session(self.engine, expire_on_commit=False)
+        
+    def initialize_journal(self) -> None:
+        UserJournalState.__table__.create(self.engine, checkfirst=True)
+        self.sequence = self.get_last_sequence()
+        last_sequence = self.sequence
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r') as file:
+                for line in file:
+                    try:
+                        sequence, user_id, themes, solved = json.loads(line)
+                    except ValueError:
+                        continue
+                    if sequence <= last_sequence:
+                        continue
+                    self.pending_results.append((user_id, themes, solved))
+                    self.sequence = max(self.sequence, sequence)
+        self.journal_file = open(self.journal_path, 'a')
+        self.flush_statistics()
+        if not self.pending_results:
+            self.journal_file.truncate(0)
+
+    def get_last_sequence(self) -> int:
+        query = (
+            select(UserJournalState.last_sequence)
+            .where(UserJournalState.journal_id == 0)
+        )
+        return self.session.execute(query).scalar() or 0
+
+    def close(self) -> None:
+        self.flush_statistics()
+        if self.journal_file:
+            self.journal_file.close()
+            self.journal_file = None
         
     def create_database(self) -> None:
         Base.metadata.create_all(self.engine)
@@ -99,6 +151,7 @@ class UserDataManager:
         return user_settings
     
     def get_user_puzzle_statistics(self, user_id: int) -> Optional[UserPuzzleStatistics]:
+        self.flush_statistics()
         query = (
             select(UserPuzzleStatistics)
             .filter(UserPuzzleStatistics.user_id == user_id)
@@ -108,47 +161,41 @@ class UserDataManager:
     
     def get_user_theme_statistics(
         self, user_id: int
-    ) -> Tuple[Optional[Sequence], Optional[Sequence], Optional[Sequence]]:
-        query_1 = (
-            select(UserThemeStatistics)
-            .where(UserThemeStatistics.user_id == user_id)
-            .order_by(UserThemeStatistics.puzzles_played.desc())
-            .limit(3)
-        )
-        query_2 = (
-            select(
-                UserThemeStatistics,
-                (UserThemeStatistics.puzzles_solved / UserThemeStatistics.puzzles_played)
-                .label('percentage')
-            )
-            .where(UserThemeStatistics.user_id == user_id)
-            .order_by(
-                (UserThemeStatistics.puzzles_solved / UserThemeStatistics.puzzles_played)
-                .desc()
-            )
-            .limit(3)
-        )
-        query_3 = (
+    ) -> Tuple[List[ThemeStatistics], List[ThemeStatistics], List[ThemeStatistics]]:
+        self.flush_statistics()
+        if user_id in self.theme_statistics_cache:
+            return self.theme_statistics_cache[user_id]
+
+        query = (
             select(
-                UserThemeStatistics,
-                (UserThemeStatistics.puzzles_solved / UserThemeStatistics.puzzles_played)
-                .label('percentage')
+                UserThemeStatistics.theme,
+                UserThemeStatistics.puzzles_played,
+                UserThemeStatistics.puzzles_solved
             )
             .where(UserThemeStatistics.user_id == user_id)
-            .order_by(
-                (UserThemeStatistics.puzzles_solved / UserThemeStatistics.puzzles_played)
-                .asc()
-            )
-            .limit(3)
         )
+        theme_statistics = [
+            (theme, puzzles_played, puzzles_solved / puzzles_played)
+            for theme, puzzles_played, puzzles_solved in self.session.execute(query)
+            if puzzles_played > 0
+        ]
 
-        most_popular = self.session.execute(query_1).all()
-        best_percentage = self.session.execute(query_2).all()
-        worst_percentage = self.session.execute(query_3).all()
+        most_popular = sorted(
+            theme_statistics, key=lambda row: (-row[1], row[0])
+        )[:3]
+        best_percentage = sorted(
+            theme_statistics, key=lambda row: (-row[2], -row[1], row[0])
+        )[:3]
+        worst_percentage = sorted(
+            theme_statistics, key=lambda row: (row[2], -row[1], row[0])
+        )[:3]
 
-        return most_popular, best_percentage, worst_percentage
+        result = most_popular, best_percentage, worst_percentage
+        self.theme_statistics_cache[user_id] = result
+        return result
     
     def reset_user_progress(self, user_id: int) -> None:
+        self.flush_statistics()
         try:
             query = (
                 update(UserPuzzleStatistics)
@@ -165,6 +212,8 @@ class UserDataManager:
             self.session.commit()
         except Exception as e:
             self.session.rollback()
+        finally:
+            self.theme_statistics_cache.pop(user_id, None)
 
     def update_user_settings(
         self, user_id: int, board_style: str, piece_style: str
@@ -183,48 +232,97 @@ class UserDataManager:
     def update_user_puzzle_statistics(
         self, user_id: int, themes: str, solved: bool
     ) -> None:
-        try:
-            query = (
-                update(UserPuzzleStatistics)
-                .where(UserPuzzleStatistics.user_id == user_id)
-                .values(
-                    puzzles_played=UserPuzzleStatistics.puzzles_played + 1,
-                    puzzles_solved=UserPuzzleStatistics.puzzles_solved + int(solved)
-                )
-            )
-            self.session.execute(query)
+        self.write_puzzle_statistics([(user_id, themes, solved)])
+
+    def record_puzzle_result(self, user_id: int, themes: str, solved: bool) -> None:
+        result = (user_id, themes, bool(solved))
+        self.sequence += 1
+        self.journal_file.write(json.dumps((self.sequence, *result)) + '\n')
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+        self.pending_results.append(result)
+        if len(self.pending_results) >= self.flush_threshold:
+            self.flush_statistics()
+
+    def flush_statistics(self) -> None:
+        if not self.pending_results:
+            return
+        if self.write_puzzle_statistics(self.pending_results, self.sequence):
+            self.pending_results = []
+            if self.journal_file:
+                self.journal_file.truncate(0)
+
+    def write_puzzle_statistics(
+        self,
+        results: List[Tuple[int, str, bool]],
+        last_sequence: Optional[int] = None
+    ) -> bool:
+        puzzle_totals: Dict[int, List[int]] = {}
+        theme_totals: Dict[Tuple[int, str], List[int]] = {}
+        for user_id, themes, solved in results:
+            totals = puzzle_totals.setdefault(user_id, [0, 0])
+            totals[0] += 1
+            totals[1] += int(solved)
+            for theme in set(themes.split()):
+                totals = theme_totals.setdefault((user_id, theme), [0, 0])
+                totals[0] += 1
+                totals[1] += int(solved)
 
-            themes = themes.split()
-            for theme in themes:
+        try:
+            for user_id, (played, solved) in puzzle_totals.items():
                 query = (
-                    select(UserThemeStatistics)
-                    .filter(
-                        UserThemeStatistics.user_id == user_id,
-                        UserThemeStatistics.theme == theme
+                    update(UserPuzzleStatistics)
+                    .where(UserPuzzleStatistics.user_id == user_id)
+                    .values(
+                        puzzles_played=UserPuzzleStatistics.puzzles_played + played,
+                        puzzles_solved=UserPuzzleStatistics.puzzles_solved + solved
                     )
                 )
-                record = self.session.execute(query).scalar()
-                if record:
-                    query = (
-                        update(UserThemeStatistics)
-                        .where(
-                            UserThemeStatistics.user_id == user_id,
-                            UserThemeStatistics.theme == theme
-                        )
-                        .values(
-                            puzzles_played=UserThemeStatistics.puzzles_played + 1,
-                            puzzles_solved=UserThemeStatistics.puzzles_solved + int(solved)
+                self.session.execute(query)
+
+            if theme_totals:
+                query = insert(UserThemeStatistics)
+                query = query.on_conflict_do_update(
+                    index_elements=[
+                        UserThemeStatistics.user_id, UserThemeStatistics.theme
+                    ],
+                    set_={
+                        'puzzles_played': (
+                            UserThemeStatistics.puzzles_played
+                            + query.excluded.puzzles_played
+                        ),
+                        'puzzles_solved': (
+                            UserThemeStatistics.puzzles_solved
+                            + query.excluded.puzzles_solved
                         )
-                    )
-                    self.session.execute(query)
-                else:
-                    user_theme_statistics = UserThemeStatistics(
-                        user_id=user_id,
-                        theme=theme,
-                        puzzles_played=1,
-                        puzzles_solved=int(solved)
-                    )
-                    self.session.add(user_theme_statistics)
+                    }
+                )
+                self.session.execute(
+                    query,
+                    [
+                        {
+                            'user_id': user_id,
+                            'theme': theme,
+                            'puzzles_played': played,
+                            'puzzles_solved': solved
+                        }
+                        for (user_id, theme), (played, solved) in theme_totals.items()
+                    ]
+                )
+            if last_sequence is not None:
+                query = insert(UserJournalState).values(
+                    journal_id=0, last_sequence=last_sequence
+                )
+                query = query.on_conflict_do_update(
+                    index_elements=[UserJournalState.journal_id],
+                    set_={'last_sequence': query.excluded.last_sequence}
+                )
+                self.session.execute(query)
             self.session.commit()
+            return True
         except Exception as e:
-            self.session.rollback()
\ No newline at end of file
+            self.session.rollback()
+            return False
+        finally:
+            for user_id in puzzle_totals:
+                self.theme_statistics_cache.pop(user_id, None)
\ No newline at end of file
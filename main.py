@@ -1,9 +1,15 @@
+from PyQt6.QtWidgets import QMessageBox
+
 from ui import Application, MainWindow
 
 
 def main() -> None:
     app = Application()
-    window = MainWindow()
+    try:
+        window = MainWindow()
+    except RuntimeError as error:
+        QMessageBox.critical(None, 'Chess Puzzles', str(error))
+        return
     window.show()
     app.exec()
 
@@ -0,0 +1,85 @@
+import os
+import csv
+import random
+
+import chess
+import pytest
+
+from data_managers import PuzzleImporter, PuzzleManager, UserDataManager
+
+
+THEMES = ('fork', 'pin', 'mateIn1', 'endgame', 'short', 'long')
+
+
+def random_puzzle(rng: random.Random) -> tuple:
+    board = chess.Board()
+    for _ in range(rng.randrange(4, 12)):
+        board.push(rng.choice(list(board.legal_moves)))
+    fen = board.fen()
+    moves = []
+    for _ in range(rng.choice((2, 4, 6))):
+        legal_moves = list(board.legal_moves)
+        if not legal_moves:
+            break
+        move = rng.choice(legal_moves)
+        moves.append(move.uci())
+        board.push(move)
+    return fen, ' '.join(moves[:len(moves) // 2 * 2])
+
+
+def write_puzzle_csv(path, count: int, seed: int = 0, unique: bool = True) -> None:
+    rng = random.Random(seed)
+    fen, moves = random_puzzle(rng)
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        for index in range(count):
+            if unique:
+                fen, moves = random_puzzle(rng)
+            writer.writerow((
+                f'p{index:07d}', fen, moves, rng.randrange(600, 2800),
+                rng.randrange(50, 100), 90, 100,
+                ' '.join(rng.sample(THEMES, rng.randrange(1, 4))), '', ''
+            ))
+
+
+def build_puzzle_db(tmp_path, count: int, seed: int = 0, unique: bool = True) -> str:
+    csv_path = tmp_path / f'puzzles_{count}.csv'
+    db_path = str(tmp_path / f'puzzles_{count}.db')
+    write_puzzle_csv(csv_path, count, seed, unique)
+    PuzzleImporter(db_path).import_csv(str(csv_path))
+    return db_path
+
+
+@pytest.fixture
+def puzzle_db(tmp_path) -> str:
+    return build_puzzle_db(tmp_path, 300)
+
+
+@pytest.fixture(scope='session')
+def qt_app():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def chess_board(qt_app, puzzle_db, tmp_path, monkeypatch):
+    from data_managers import DataAccessWorker, data_access_worker
+    from board import ChessBoard
+
+    def create_user_data_manager() -> UserDataManager:
+        user_data_manager = UserDataManager(str(tmp_path / 'users_db.db'))
+        user_data_manager.create_database()
+        return user_data_manager
+
+    monkeypatch.setattr(
+        data_access_worker, 'PuzzleManager', lambda: PuzzleManager(puzzle_db)
+    )
+    monkeypatch.setattr(
+        data_access_worker, 'UserDataManager', create_user_data_manager
+    )
+    data_access = DataAccessWorker()
+    board = ChessBoard(data_access)
+    yield board
+    data_access.shutdown()
+    board.deleteLater()
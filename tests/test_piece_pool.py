@@ -0,0 +1,46 @@
+from PyQt6.QtCore import QCoreApplication, QEvent
+from PyQt6.QtWidgets import QApplication
+
+from board.pieces import ChessPiece
+
+
+def load_puzzle(qt_app, board):
+    statuses = []
+    board.board_status_signal.connect(statuses.append)
+    board.initialize_puzzle()
+    while not statuses:
+        qt_app.processEvents()
+    board.board_status_signal.disconnect(statuses.append)
+    return statuses[0]
+
+
+def solve_puzzle(board):
+    board_controller = board.board_controller
+    while board_controller.is_board_active:
+        session = board_controller.session
+        move = session.moves[session.current_move]
+        board_controller.select_promotion_piece = (
+            lambda color, piece_style, promotion=move[4:]: promotion
+        )
+        piece = board_controller.get_piece_at(move[:2])
+        board_controller.handle_player_move(piece, square=move[2:4])
+
+
+def count_widgets(board):
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    return len(board.findChildren(ChessPiece)), len(QApplication.allWidgets())
+
+
+def test_widget_count_stays_flat_across_puzzle_loads(qt_app, chess_board):
+    counts = []
+    for index in range(1000):
+        assert load_puzzle(qt_app, chess_board) == 0
+        solve_puzzle(chess_board)
+        if index in (9, 999):
+            counts.append(count_widgets(chess_board))
+
+    (pieces_after_10, widgets_after_10), (pieces_after_1000, widgets_after_1000) = counts
+    assert pieces_after_1000 <= 32
+    assert pieces_after_1000 - pieces_after_10 <= 4
+    assert widgets_after_1000 == widgets_after_10 + (pieces_after_1000 - pieces_after_10)
+    assert chess_board.piece_pool.created_pieces == pieces_after_1000
@@ -0,0 +1,124 @@
+import os
+import csv
+import sqlite3
+
+from data_managers import PuzzleImporter
+
+from conftest import write_puzzle_csv
+
+
+def test_pack_puzzles_skips_rows_that_cannot_be_encoded(puzzle_db):
+    with sqlite3.connect(puzzle_db) as connection:
+        connection.execute(
+            "UPDATE puzzle_moves SET moves = 'e2e4 zz99' WHERE puzzle_id = 'p0000007'"
+        )
+        connection.execute(
+            "UPDATE puzzle_moves SET fen = 'not a fen' WHERE puzzle_id = 'p0000123'"
+        )
+
+    assert PuzzleImporter(puzzle_db, batch_size=50).pack_puzzles() == 298
+
+    with sqlite3.connect(puzzle_db) as connection:
+        unpacked = connection.execute(
+            'SELECT puzzle_id FROM puzzle_moves WHERE packed IS NULL ORDER BY puzzle_id'
+        ).fetchall()
+    assert unpacked == [('p0000007',), ('p0000123',)]
+
+
+def read_derived_tables(db_path):
+    with sqlite3.connect(db_path) as connection:
+        names = dict(connection.execute('SELECT theme_id, name FROM theme'))
+        names[-1] = None
+        return {
+            'order': connection.execute(
+                'SELECT ordinal, puzzle_id, rating FROM puzzle_order ORDER BY ordinal'
+            ).fetchall(),
+            'theme': sorted(
+                (names[theme_id], *row) for theme_id, *row in connection.execute(
+                    'SELECT theme_id, position, puzzle_id, rating FROM puzzle_theme'
+                )
+            ),
+            'group': sorted(
+                (str(names[theme_id]), *row) for theme_id, *row in connection.execute(
+                    'SELECT theme_id, player_color, num_player_moves, position, '
+                    'puzzle_id, rating FROM puzzle_group'
+                )
+            ),
+            'count': sorted(
+                (str(names[theme_id]), *row) for theme_id, *row in connection.execute(
+                    'SELECT theme_id, player_color, num_player_moves, rating, count '
+                    'FROM puzzle_count'
+                )
+            )
+        }
+
+
+def test_delta_import_matches_a_full_import(tmp_path):
+    base_path = tmp_path / 'base.csv'
+    write_puzzle_csv(base_path, 300)
+    with open(base_path, newline='') as file:
+        rows = list(csv.reader(file))
+    new_path = tmp_path / 'new.csv'
+    write_puzzle_csv(new_path, 20, seed=1)
+    with open(new_path, newline='') as file:
+        new_rows = [[f'n{index:07d}', *row[1:]] for index, row in enumerate(csv.reader(file))]
+
+    delta = [row[:] for row in rows[:60]]
+    for index, row in enumerate(delta):
+        if index % 3 == 0:
+            row[3] = str(int(row[3]) + 150)
+        elif index % 3 == 1:
+            row[7] = 'quiet' if index % 2 else f'{row[7]} quiet'
+        else:
+            row[1:3] = new_rows[index % len(new_rows)][1:3]
+    delta += new_rows
+    delta += [row for row in rows[60:] if 'long' in row[7].split()]
+    for row in delta:
+        row[7] = ' '.join(theme for theme in row[7].split() if theme != 'long') or 'pin'
+
+    delta_path = tmp_path / 'delta.csv'
+    with open(delta_path, 'w', newline='') as file:
+        csv.writer(file).writerows(delta)
+    merged = {row[0]: row for row in rows}
+    merged.update({row[0]: row for row in delta})
+    merged_path = tmp_path / 'merged.csv'
+    with open(merged_path, 'w', newline='') as file:
+        csv.writer(file).writerows(merged.values())
+
+    db_path = str(tmp_path / 'delta.db')
+    PuzzleImporter(db_path).import_csv(str(base_path))
+    summary = PuzzleImporter(db_path).import_delta(str(delta_path))
+    assert summary['inserted'] == 20
+    full_path = str(tmp_path / 'full.db')
+    PuzzleImporter(full_path).import_csv(str(merged_path))
+
+    assert read_derived_tables(db_path) == read_derived_tables(full_path)
+    with sqlite3.connect(db_path) as connection:
+        themes = {name for name, in connection.execute('SELECT name FROM theme')}
+    assert 'quiet' in themes and 'long' not in themes
+
+
+def test_full_import_replaces_the_database_file(tmp_path, puzzle_db):
+    csv_path = tmp_path / 'replacement.csv'
+    write_puzzle_csv(csv_path, 40, seed=2)
+    assert PuzzleImporter(puzzle_db).import_csv(str(csv_path)) == 40
+
+    assert not os.path.exists(f'{puzzle_db}.import')
+    with sqlite3.connect(puzzle_db) as connection:
+        assert connection.execute('SELECT COUNT(*) FROM puzzle_order').fetchone() == (40,)
+
+
+def test_backfilled_hashes_are_not_counted_as_updates(tmp_path):
+    csv_path = tmp_path / 'puzzles.csv'
+    write_puzzle_csv(csv_path, 50)
+    db_path = str(tmp_path / 'puzzles.db')
+    PuzzleImporter(db_path).import_csv(str(csv_path))
+    with sqlite3.connect(db_path) as connection:
+        connection.execute('UPDATE puzzle_info SET content_hash = NULL')
+
+    summary = PuzzleImporter(db_path).import_delta(str(csv_path))
+    assert (summary['updated'], summary['unchanged']) == (0, 50)
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute(
+            'SELECT COUNT(*) FROM puzzle_info WHERE content_hash IS NULL'
+        ).fetchone() == (0,)
@@ -0,0 +1,239 @@
+import csv
+import math
+import random
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from data_managers import (
+    PuzzleImporter, PuzzleManager, PuzzleMigrator, PuzzleValidator
+)
+from sqlalchemy import create_engine, event
+
+from conftest import write_puzzle_csv
+
+
+def matching_ids(
+    db_path, min_rating, max_rating, theme=None, player_color=None,
+    num_player_moves=None
+):
+    query = (
+        'SELECT puzzle_id, themes, player_color, num_player_moves '
+        'FROM puzzle_info JOIN puzzle_moves USING (puzzle_id) '
+        'WHERE rating BETWEEN ? AND ?'
+    )
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute(query, (min_rating, max_rating)).fetchall()
+    return {
+        puzzle_id for puzzle_id, themes, color, length in rows
+        if (theme is None or theme in themes.split())
+        and (player_color is None or color == player_color)
+        and (num_player_moves is None or length == num_player_moves)
+    }
+
+
+def assert_uniform(counts, expected_ids):
+    assert set(counts) == expected_ids
+    draws = sum(counts.values())
+    expected = draws / len(expected_ids)
+    chi_square = sum((count - expected) ** 2 / expected for count in counts.values())
+    degrees = len(expected_ids) - 1
+    assert chi_square < degrees + 4 * math.sqrt(2 * degrees)
+
+
+def test_draws_are_uniform_within_filters(puzzle_db):
+    random.seed(1)
+    manager = PuzzleManager(puzzle_db)
+    expected_ids = matching_ids(puzzle_db, 1000, 2200, 'fork')
+    draws = 200 * len(expected_ids)
+
+    counts = Counter(
+        manager.get_puzzle(1000, 2200, 'fork')[0].puzzle_id for _ in range(draws)
+    )
+
+    assert_uniform(counts, expected_ids)
+
+
+@pytest.mark.parametrize('filters', [
+    (1000, 2200, 'fork', 'w', None),
+    (1000, 2200, None, None, 1),
+    (None, None, 'pin', 'b', 2),
+])
+def test_side_and_length_draws_are_uniform(puzzle_db, filters):
+    random.seed(2)
+    manager = PuzzleManager(puzzle_db)
+    min_rating, max_rating = filters[:2] if filters[0] else (0, 5000)
+    expected_ids = matching_ids(puzzle_db, min_rating, max_rating, *filters[2:])
+    draws = 200 * len(expected_ids)
+
+    counts = Counter(
+        manager.get_puzzle(*filters)[0].puzzle_id for _ in range(draws)
+    )
+    assert_uniform(counts, expected_ids)
+
+
+def test_counts_match_the_database(puzzle_db):
+    manager = PuzzleManager(puzzle_db)
+    for theme in (None, 'fork', 'endgame', 'missing'):
+        for player_color in (None, 'w', 'b'):
+            for num_player_moves in (None, 0, 1, 2, 5):
+                for min_rating, max_rating in ((0, 5000), (900, 1500), (1600, 1600)):
+                    expected = len(matching_ids(
+                        puzzle_db, min_rating, max_rating, theme,
+                        player_color, num_player_moves
+                    ))
+                    assert manager.get_puzzle_count(
+                        min_rating, max_rating, theme, player_color, num_player_moves
+                    ) == expected
+
+
+def test_malformed_fens_do_not_break_the_metadata_backfill(puzzle_db):
+    with sqlite3.connect(puzzle_db) as connection:
+        connection.execute(
+            "UPDATE puzzle_moves SET fen = 'garbage' WHERE puzzle_id = 'p0000005'"
+        )
+        connection.execute('UPDATE puzzle_info SET player_color = NULL')
+    PuzzleMigrator(create_engine(f'sqlite:///{puzzle_db}')).rebuild()
+
+    manager = PuzzleManager(puzzle_db)
+    with sqlite3.connect(puzzle_db) as connection:
+        missing = connection.execute(
+            'SELECT puzzle_id FROM puzzle_info WHERE player_color IS NULL'
+        ).fetchall()
+    assert missing == [('p0000005',)]
+    assert manager.get_puzzle_count(player_color='w') + manager.get_puzzle_count(
+        player_color='b'
+    ) == 299
+
+
+def test_unfiltered_draws_match_the_count(puzzle_db):
+    with sqlite3.connect(puzzle_db) as connection:
+        connection.execute(
+            "UPDATE puzzle_moves SET fen = 'garbage' WHERE puzzle_id = 'p0000005'"
+        )
+        connection.execute(
+            "UPDATE puzzle_info SET player_color = NULL WHERE puzzle_id = 'p0000005'"
+        )
+    PuzzleMigrator(create_engine(f'sqlite:///{puzzle_db}')).rebuild()
+
+    manager = PuzzleManager(puzzle_db)
+    assert manager.get_puzzle_count() == 299
+    with sqlite3.connect(puzzle_db) as connection:
+        assert connection.execute('SELECT COUNT(*) FROM puzzle_order').fetchone() == (299,)
+        theme_rows = connection.execute(
+            "SELECT COUNT(*) FROM puzzle_theme WHERE puzzle_id = 'p0000005'"
+        ).fetchone()
+    assert theme_rows == (0,)
+
+
+def test_orphaned_info_rows_are_never_drawn(puzzle_db):
+    with sqlite3.connect(puzzle_db) as connection:
+        orphan_ids = [
+            puzzle_id for (puzzle_id,) in connection.execute(
+                'SELECT puzzle_id FROM puzzle_info ORDER BY rating LIMIT 20'
+            )
+        ]
+        connection.executemany(
+            'DELETE FROM puzzle_moves WHERE puzzle_id = ?',
+            [(puzzle_id,) for puzzle_id in orphan_ids]
+        )
+    PuzzleMigrator(create_engine(f'sqlite:///{puzzle_db}')).rebuild()
+
+    manager = PuzzleManager(puzzle_db)
+    for _ in range(500):
+        puzzle = manager.get_puzzle(600, 1200)
+        assert puzzle is not None
+        assert puzzle[0].puzzle_id not in orphan_ids
+
+
+def test_out_of_date_schemas_are_reported_not_migrated(puzzle_db):
+    with sqlite3.connect(puzzle_db) as connection:
+        connection.execute('PRAGMA user_version = 3')
+
+    with pytest.raises(RuntimeError, match='python -m data_managers migrate'):
+        PuzzleManager(puzzle_db)
+    with sqlite3.connect(puzzle_db) as connection:
+        assert connection.execute('PRAGMA user_version').fetchone() == (3,)
+
+
+def test_open_managers_see_later_imports(tmp_path, puzzle_db):
+    manager = PuzzleManager(puzzle_db)
+    assert manager.get_puzzle_count(0, 5000) == 300
+    assert manager.get_puzzle_count(0, 5000, 'fork', 'w') == len(
+        matching_ids(puzzle_db, 0, 5000, 'fork', 'w')
+    )
+    assert 'quiet' not in manager.get_puzzle_themes()
+
+    delta_path = tmp_path / 'delta.csv'
+    write_puzzle_csv(delta_path, 20, seed=1)
+    with open(delta_path, newline='') as file:
+        rows = [[*row[:3], '3000', *row[4:7], 'fork quiet', *row[8:]]
+                for row in csv.reader(file)]
+    with open(delta_path, 'w', newline='') as file:
+        csv.writer(file).writerows(rows)
+    PuzzleImporter(puzzle_db).import_delta(str(delta_path))
+
+    assert manager.get_rating_range()[1] == 3000
+    assert 'quiet' in manager.get_puzzle_themes()
+    assert manager.get_puzzle_count(0, 5000, 'fork', 'w') == len(
+        matching_ids(puzzle_db, 0, 5000, 'fork', 'w')
+    )
+    assert manager.get_puzzle(3000, 3000, 'quiet')[0].rating == 3000
+
+    PuzzleValidator(puzzle_db).quarantine_puzzles(
+        create_engine(f'sqlite:///{puzzle_db}'), {'p0000000': 'test'}
+    )
+    assert manager.get_puzzle_count(3000, 3000) == 19
+
+    PuzzleImporter(puzzle_db).import_csv(str(delta_path))
+    assert manager.get_puzzle_count(0, 5000) == 20
+
+
+def test_edits_outside_the_importer_require_a_rebuild(puzzle_db):
+    manager = PuzzleManager(puzzle_db)
+    assert manager.get_puzzle_count() == 300
+    PuzzleImporter(puzzle_db).pack_puzzles()
+    assert manager.get_puzzle_count() == 300
+
+    with sqlite3.connect(puzzle_db) as connection:
+        connection.execute(
+            "UPDATE puzzle_info SET rating = 3500 WHERE puzzle_id = 'p0000003'"
+        )
+        connection.execute("DELETE FROM puzzle_moves WHERE puzzle_id = 'p0000006'")
+        connection.execute("DELETE FROM puzzle_info WHERE puzzle_id = 'p0000006'")
+
+    with pytest.raises(RuntimeError, match='migrate --rebuild'):
+        manager.get_puzzle()
+    with pytest.raises(RuntimeError, match='migrate --rebuild'):
+        manager.get_puzzle_count()
+    with pytest.raises(RuntimeError, match='migrate --rebuild'):
+        PuzzleManager(puzzle_db)
+
+    PuzzleMigrator(create_engine(f'sqlite:///{puzzle_db}')).rebuild()
+    assert manager.get_puzzle_count() == 299
+    assert manager.get_rating_range()[1] == 3500
+    assert manager.get_puzzle(3500, 3500)[0].puzzle_id == 'p0000003'
+
+
+def test_draws_look_puzzles_up_by_position(puzzle_db):
+    manager = PuzzleManager(puzzle_db)
+    statements = []
+    event.listen(
+        manager.engine, 'before_cursor_execute',
+        lambda connection, cursor, statement, *args: statements.append(statement)
+    )
+    for filters, table in (
+        ((1000, 2000), 'puzzle_order.ordinal = ?'),
+        ((1000, 2000, 'pin'), 'puzzle_theme.position = ?'),
+        ((1000, 2000, 'pin', 'w', 2), 'puzzle_group.position = ?'),
+    ):
+        statements.clear()
+        for _ in range(20):
+            assert manager.get_puzzle(*filters) is not None
+        draws = [statement for statement in statements if 'puzzle_moves' in statement]
+        assert len(draws) == 20
+        assert all(
+            table in statement and 'OFFSET' not in statement for statement in draws
+        )
+        assert not any('random()' in statement.lower() for statement in statements)
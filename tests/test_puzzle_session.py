@@ -0,0 +1,23 @@
+import chess
+
+from board import PuzzleSession
+
+
+def test_en_passant_targets_are_marked_as_captures():
+    board = chess.Board('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2')
+    session = PuzzleSession(board, ['e1e2', 'e8e7'], player_color='w')
+
+    targets = session.get_legal_moves()['e5']
+    assert targets['d6'].is_capture
+    assert not targets['e6'].is_capture
+
+
+def test_promotions_are_detected_by_target_square():
+    board = chess.Board('1n2k3/P7/8/8/8/8/8/4K3 w - - 0 1')
+    session = PuzzleSession(board, ['e1e2', 'e8e7'], player_color='w')
+
+    assert session.check_for_promotion('a7', 'b8')
+    assert session.check_for_promotion('a7', 'a8')
+    assert session.get_legal_moves()['a7']['b8'].is_capture
+    assert not session.check_for_promotion('e1', 'e2')
+    assert not session.check_for_promotion('e1', 'e5')
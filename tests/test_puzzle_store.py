@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from data_managers import PuzzleStore, PuzzleStoreBuilder
+
+
+@pytest.fixture
+def puzzle_store(puzzle_db, tmp_path):
+    store_path = str(tmp_path / 'puzzles_db.store')
+    PuzzleStoreBuilder(puzzle_db, store_path).build()
+    store = PuzzleStore(store_path)
+    yield store
+    store.close()
+
+
+def test_stored_puzzles_match_the_database(puzzle_db, puzzle_store):
+    with sqlite3.connect(puzzle_db) as connection:
+        rows = {
+            puzzle_id: (rating, themes, player_color, fen, moves)
+            for puzzle_id, rating, themes, player_color, fen, moves in connection.execute(
+                'SELECT puzzle_info.puzzle_id, rating, themes, player_color, fen, moves '
+                'FROM puzzle_info JOIN puzzle_moves USING (puzzle_id)'
+            )
+        }
+
+    for _ in range(200):
+        puzzle = puzzle_store.get_puzzle(1000, 2000, 'pin')
+        rating, themes, player_color, fen, moves = rows[puzzle.puzzle_id]
+        assert 1000 <= puzzle.rating <= 2000
+        assert 'pin' in puzzle.themes.split()
+        assert (puzzle.rating, puzzle.themes, puzzle.player_color) == (
+            rating, themes, player_color
+        )
+        assert puzzle.board.fen() == fen
+        assert puzzle.moves == moves.split()
+
+
+def test_filtered_positions_are_bounded(puzzle_store):
+    for min_rating in range(600, 2600, 50):
+        puzzle_store.get_puzzle_count(min_rating, min_rating + 400, None, 'w')
+    assert len(puzzle_store.filtered_positions) == puzzle_store.filtered_positions_size
+
+    puzzle_store.get_puzzle_count(2550, 2950, None, 'w')
+    newest_key = next(reversed(puzzle_store.filtered_positions))
+    puzzle_store.get_puzzle_count(600, 1000, None, 'b')
+    assert newest_key in puzzle_store.filtered_positions
+
+
+def test_build_skips_puzzles_it_cannot_store(puzzle_db, tmp_path):
+    with sqlite3.connect(puzzle_db) as connection:
+        connection.execute(
+            "UPDATE puzzle_moves SET fen = 'garbage' WHERE puzzle_id = 'p0000007'"
+        )
+        connection.execute(
+            "UPDATE puzzle_info SET player_color = NULL, piece_count = NULL "
+            "WHERE puzzle_id = 'p0000123'"
+        )
+
+    store_path = str(tmp_path / 'puzzles_db.store')
+    summary = PuzzleStoreBuilder(puzzle_db, store_path).build()
+    assert summary == {'written': 298, 'skipped': 1}
+
+    store = PuzzleStore(store_path)
+    assert store.get_puzzle_count() == 298
+    store.close()
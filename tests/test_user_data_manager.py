@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from data_managers import UserDataManager
+from data_managers.user_data_manager import UserPuzzleStatistics
+
+
+@pytest.fixture
+def users_db(tmp_path):
+    db_path = str(tmp_path / 'users_db.db')
+    manager = UserDataManager(db_path)
+    manager.create_database()
+    manager.add_user('player')
+    manager.close()
+    return db_path
+
+
+def get_puzzles_played(manager, user_id=1):
+    return manager.session.get(UserPuzzleStatistics, user_id).puzzles_played
+
+
+def test_unflushed_results_are_replayed_from_the_journal(users_db):
+    manager = UserDataManager(users_db)
+    for _ in range(3):
+        manager.record_puzzle_result(1, 'fork short', True)
+    manager.journal_file.close()
+
+    manager = UserDataManager(users_db)
+    assert get_puzzles_played(manager) == 3
+    manager.close()
+
+
+def test_results_applied_before_a_crash_are_not_counted_twice(users_db):
+    manager = UserDataManager(users_db)
+    for _ in range(3):
+        manager.record_puzzle_result(1, 'fork short', True)
+    with open(manager.journal_path) as file:
+        journal = file.read()
+    manager.flush_statistics()
+    manager.record_puzzle_result(1, 'pin', False)
+    manager.journal_file.close()
+
+    with open(manager.journal_path) as file:
+        journal += file.read()
+    with open(manager.journal_path, 'w') as file:
+        file.write(journal)
+
+    manager = UserDataManager(users_db)
+    assert get_puzzles_played(manager) == 4
+    manager.close()
+    assert os.path.getsize(manager.journal_path) == 0
+
+
+def test_databases_in_one_directory_keep_separate_journals(users_db, tmp_path):
+    other_db = str(tmp_path / 'other_db.db')
+    other = UserDataManager(other_db)
+    other.create_database()
+    other.add_user('player')
+    other.record_puzzle_result(1, 'pin', True)
+    other.journal_file.close()
+
+    manager = UserDataManager(users_db)
+    assert manager.journal_path != other.journal_path
+    assert get_puzzles_played(manager) == 0
+    manager.close()
+
+    other = UserDataManager(other_db)
+    assert get_puzzles_played(other) == 1
+    other.close()
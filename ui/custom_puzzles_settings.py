@@ -1,3 +1,4 @@
+from typing import List
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSpinBox, QComboBox
 from PyQt6.QtCore import Qt
 
@@ -44,10 +45,20 @@ class CustomPuzzlesSettings(QWidget):
         theme_label = MenuHeading(
             'Theme:', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
         )
+        player_color_label = MenuHeading(
+            'Play as:', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        )
+        solution_length_label = MenuHeading(
+            'Solution length:', Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        )
         
         self.min_rating_value = RatingSelector()
         self.max_rating_value = RatingSelector()
         self.theme_value = ThemeSelector()
+        self.player_color_value = FilterSelector(['--all--', 'White', 'Black'])
+        self.solution_length_value = FilterSelector(
+            ['--all--', '1 move'] + [f'{moves} moves' for moves in range(2, 6)]
+        )
 
         self.customization_container_layout.addWidget(min_rating_label, 0, 0)
         self.customization_container_layout.addWidget(self.min_rating_value, 0, 1)
@@ -55,6 +66,15 @@ class CustomPuzzlesSettings(QWidget):
         self.customization_container_layout.addWidget(self.max_rating_value, 1, 1)
         self.customization_container_layout.addWidget(theme_label, 2, 0)
         self.customization_container_layout.addWidget(self.theme_value, 2, 1)
+        self.customization_container_layout.addWidget(player_color_label, 3, 0)
+        self.customization_container_layout.addWidget(self.player_color_value, 3, 1)
+        self.customization_container_layout.addWidget(solution_length_label, 4, 0)
+        self.customization_container_layout.addWidget(self.solution_length_value, 4, 1)
+
+        self.puzzle_count_label = MenuHeading()
+        self.customization_container_layout.addWidget(
+            self.puzzle_count_label, 5, 0, 1, 2
+        )
 
     def create_buttons_container(self) -> None:
         container = MainMenu.create_menu_container()
@@ -77,4 +97,12 @@ class ThemeSelector(QComboBox):
     def __init__(self) -> None:
         super().__init__()
         self.setMinimumHeight(40)
-        self.setStyleSheet('background-color: #2a2b2e;')
\ No newline at end of file
+        self.setStyleSheet('background-color: #2a2b2e;')
+
+
+class FilterSelector(QComboBox):
+    def __init__(self, items: List[str]) -> None:
+        super().__init__()
+        self.setMinimumHeight(40)
+        self.setStyleSheet('background-color: #2a2b2e;')
+        self.addItems(items)
\ No newline at end of file
@@ -1,7 +1,7 @@
 import os
 
 from PyQt6.QtWidgets import QApplication, QMainWindow, QStackedWidget
-from PyQt6.QtGui import QFont, QFontDatabase
+from PyQt6.QtGui import QFont, QFontDatabase, QCloseEvent
 
 from .main_menu import MainMenu
 from .puzzles_window import PuzzlesWindow
@@ -9,6 +9,7 @@ from .custom_puzzles_settings import CustomPuzzlesSettings
 from .statistics_window import StatisticsWindow
 from .settings_menu import SettingsMenu
 from .ui_controller import UIController
+from data_managers import DataAccessWorker
 
 
 class Application(QApplication):
@@ -40,6 +41,7 @@ class Application(QApplication):
 class MainWindow(QMainWindow):
     def __init__(self) -> None:
         super().__init__()
+        self.data_access = DataAccessWorker()
         self.setWindowTitle('Chess Puzzles')
         self.setContentsMargins(10, 10, 10, 10)
         self.setMinimumSize(1400, 800)
@@ -48,12 +50,17 @@ class MainWindow(QMainWindow):
         self.initialize_central_widget()
         self.ui_controller = UIController(self)
 
+    def closeEvent(self, event: QCloseEvent) -> None:
+        self.ui_controller.shutdown()
+        self.data_access.shutdown()
+        super().closeEvent(event)
+
     def initialize_central_widget(self) -> None:
         self.central_widget = QStackedWidget()
         self.setCentralWidget(self.central_widget)
 
         self.main_menu = MainMenu()
-        self.puzzles_window = PuzzlesWindow()
+        self.puzzles_window = PuzzlesWindow(self.data_access)
         self.custom_puzzles_settings = CustomPuzzlesSettings()
         self.statistics_window = StatisticsWindow()
         self.settings_menu = SettingsMenu()
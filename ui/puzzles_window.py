@@ -1,13 +1,17 @@
+import os
+
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
 from PyQt6.QtCore import Qt
 
 from .main_menu import MainMenu, MenuButton, AppNameLabel, MenuHeading
-from board import ChessBoard
+from board import ChessBoard, PaintedChessBoard
+from data_managers import DataAccessWorker
 
 
 class PuzzlesWindow(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, data_access: DataAccessWorker) -> None:
         super().__init__()
+        self.data_access = data_access
         self.initialize_layout()
 
     def initialize_layout(self) -> None:
@@ -26,7 +30,10 @@ class PuzzlesWindow(QWidget):
     def create_main_layout(self) -> None:
         self.main_layout = QHBoxLayout(self)
         self.main_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.board_widget = ChessBoard()
+        if os.environ.get('CHESS_EXERCISES_BOARD') == 'painted':
+            self.board_widget = PaintedChessBoard(self.data_access)
+        else:
+            self.board_widget = ChessBoard(self.data_access)
         self.main_layout.addWidget(self.board_widget)
         self.side_layout = QVBoxLayout()
         self.main_layout.addLayout(self.side_layout)
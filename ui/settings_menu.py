@@ -1,13 +1,11 @@
-import os
-
 from typing import List, Optional
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QGridLayout, QLabel,
     QHBoxLayout, QRadioButton, QButtonGroup
 )
-from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import Qt
 
+from board.asset_cache import AssetCache
 from .main_menu import MainMenu, MenuButton, MenuHeading, AppNameLabel
 
 
@@ -81,18 +79,10 @@ class StyleOption(QWidget):
         super().__init__(parent)
         self.style_option = style_option
         self.grid_size = grid_size
-        self.set_assets_dir()
         self.setMinimumWidth(150)
         self.initialize_layout()
         button_group.addButton(self.radio_button)
 
-    def set_assets_dir(self) -> None:
-        element = 'boards' if self.grid_size == 4 else 'pieces'
-        assets_dir = os.path.join(
-            os.path.dirname(__file__), '..', 'assets', element, self.style_option
-        )
-        self.assets_dir = os.path.normpath(assets_dir)
-
     def initialize_layout(self) -> None:
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setAlignment(Qt.AlignmentFlag.AlignHCenter)
@@ -115,12 +105,12 @@ class StyleOption(QWidget):
         
     def initialize_images(self) -> None:
         if self.grid_size == 4:
-            white_square_pix = QPixmap(
-                os.path.join(self.assets_dir, 'black.png')
-            ).scaled(40, 40)
-            black_square_pix = QPixmap(
-                os.path.join(self.assets_dir, 'white.png')
-            ).scaled(40, 40)
+            white_square_pix = AssetCache.get_square_pixmap(
+                self.style_option, 'black', 40
+            )
+            black_square_pix = AssetCache.get_square_pixmap(
+                self.style_option, 'white', 40
+            )
             for i in range(2):
                 for j in range(2):
                     square = QLabel()
@@ -131,12 +121,12 @@ class StyleOption(QWidget):
                     square.setMaximumSize(40, 40)
                     self.grid_layout.addWidget(square, i, j)
         elif self.grid_size == 2:
-            white_queen_pix = QPixmap(
-                os.path.join(self.assets_dir, 'queen-white.png')
-            ).scaled(60, 60)
-            black_queen_pix = QPixmap(
-                os.path.join(self.assets_dir, 'queen-black.png')
-            ).scaled(60, 60)
+            white_queen_pix = AssetCache.get_piece_pixmap(
+                self.style_option, 'queen', 'white', 60
+            )
+            black_queen_pix = AssetCache.get_piece_pixmap(
+                self.style_option, 'queen', 'black', 60
+            )
             for i in range(2):
                 piece = QLabel()
                 piece.setPixmap(white_queen_pix if i == 0 else black_queen_pix)
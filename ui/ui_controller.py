@@ -1,10 +1,13 @@
 import os
 import re
 
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtCore import QTimer
 
-from data_managers import UserDataManager
+from data_managers.user_data_manager import (
+    UserSettings, UserPuzzleStatistics, ThemeStatistics
+)
 
 if TYPE_CHECKING:
     from main_window import MainWindow
@@ -14,12 +17,24 @@ class UIController:
     def __init__(self, main_window: 'MainWindow') -> None:
         self.main_window = main_window
         self.central_widget = main_window.central_widget
-        self.user_data_manager = UserDataManager()
+        self.data_access = main_window.data_access
+        self.user_data_manager = self.data_access.user_data_manager
+        self.puzzle_manager = self.data_access.puzzle_manager
         self.current_user_id = 1
+        self.custom_puzzles_count = None
 
-        self.initialize_board_theme()
-        self.initialize_custom_puzzles_settings()
-        self.initialize_settings_menu()
+        self.statistics_flush_timer = QTimer()
+        self.statistics_flush_timer.timeout.connect(self.flush_statistics)
+        self.statistics_flush_timer.start(30000)
+
+        self.data_access.submit(
+            self.user_data_manager.get_user_settings, self.current_user_id,
+            callback=self.initialize_user_settings
+        )
+        self.data_access.submit(
+            self.load_puzzle_catalog,
+            callback=self.initialize_custom_puzzles_settings
+        )
 
         self.connect_main_menu_signals()
         self.connect_puzzles_window_signals()
@@ -27,19 +42,29 @@ class UIController:
         self.connect_statistics_window_signals()
         self.connect_settings_menu_signals()
 
-    def initialize_board_theme(self) -> None:
-        user_settings = self.user_data_manager.get_user_settings(self.current_user_id)
+    def initialize_user_settings(self, user_settings: Optional[UserSettings]) -> None:
+        if user_settings is None:
+            return
+        self.initialize_board_theme(user_settings)
+        self.initialize_settings_menu(user_settings)
+
+    def initialize_board_theme(self, user_settings: UserSettings) -> None:
         board_style = user_settings.board_style
         piece_style = user_settings.piece_style
         self.main_window.puzzles_window.board_widget.set_style(board_style, piece_style)
 
-    def initialize_custom_puzzles_settings(self) -> None:
-        puzzle_manager = (
-            self.main_window.puzzles_window.board_widget.board_controller.puzzle_manager
-        )
+    def load_puzzle_catalog(self) -> Tuple[Tuple[int, int], List[str]]:
+        rating_range = self.puzzle_manager.get_rating_range()
+        themes = self.puzzle_manager.get_puzzle_themes()
+        return rating_range, themes
+
+    def initialize_custom_puzzles_settings(
+        self, puzzle_catalog: Optional[Tuple[Tuple[int, int], List[str]]]
+    ) -> None:
+        if puzzle_catalog is None:
+            return
         custom_puzzles_settings = self.main_window.custom_puzzles_settings
-        min_rating, max_rating = puzzle_manager.get_rating_range()
-        themes = puzzle_manager.get_puzzle_themes()
+        (min_rating, max_rating), themes = puzzle_catalog
         themes = ['--all--'] + self.parse_db_themes(themes, list=True)
 
         custom_puzzles_settings.min_rating_value.setRange(min_rating, max_rating)
@@ -48,8 +73,7 @@ class UIController:
         custom_puzzles_settings.max_rating_value.setValue(max_rating)
         custom_puzzles_settings.theme_value.addItems(themes)
 
-    def initialize_settings_menu(self) -> None:
-        user_settings = self.user_data_manager.get_user_settings(self.current_user_id)
+    def initialize_settings_menu(self, user_settings: UserSettings) -> None:
         user_board_style = user_settings.board_style
         user_piece_style = user_settings.piece_style
 
@@ -97,6 +121,17 @@ class UIController:
             self.reset_custom_puzzles_settings
         )
         custom_puzzles_settings.return_button.clicked.connect(self.show_main_menu)
+        for selector in (
+            custom_puzzles_settings.min_rating_value,
+            custom_puzzles_settings.max_rating_value
+        ):
+            selector.valueChanged.connect(self.update_custom_puzzles_count)
+        for selector in (
+            custom_puzzles_settings.theme_value,
+            custom_puzzles_settings.player_color_value,
+            custom_puzzles_settings.solution_length_value
+        ):
+            selector.currentIndexChanged.connect(self.update_custom_puzzles_count)
 
     def connect_statistics_window_signals(self) -> None:
         statistics_window = self.main_window.statistics_window
@@ -143,7 +178,8 @@ class UIController:
         else:
             board_style = board_style.objectName()
             piece_style = piece_style.objectName()
-            self.user_data_manager.update_user_settings(
+            self.data_access.submit(
+                self.user_data_manager.update_user_settings,
                 self.current_user_id, board_style, piece_style
             )
             
@@ -154,10 +190,45 @@ class UIController:
             'info', 'Settings saved', 'Your settings have been saved!'
         )
 
-    def initialize_custom_puzzles_window(self) -> None:
+    def get_custom_puzzles_filters(
+        self
+    ) -> Tuple[int, int, Optional[str], Optional[str], Optional[int]]:
         custom_puzzles_settings = self.main_window.custom_puzzles_settings
         min_rating = custom_puzzles_settings.min_rating_value.value()
         max_rating = custom_puzzles_settings.max_rating_value.value()
+        theme = custom_puzzles_settings.theme_value.currentText()
+        theme = None if theme in ('', '--all--') else self.parse_theme(theme)
+        player_color = custom_puzzles_settings.player_color_value.currentIndex()
+        player_color = (None, 'w', 'b')[player_color]
+        num_player_moves = custom_puzzles_settings.solution_length_value.currentIndex()
+        num_player_moves = num_player_moves or None
+        return min_rating, max_rating, theme, player_color, num_player_moves
+
+    def update_custom_puzzles_count(self) -> None:
+        filters = self.get_custom_puzzles_filters()
+        self.custom_puzzles_count = None
+        if filters[0] > filters[1]:
+            self.set_custom_puzzles_count(0)
+            return
+        self.data_access.submit(
+            self.puzzle_manager.get_puzzle_count, *filters,
+            callback=self.set_custom_puzzles_count
+        )
+
+    def set_custom_puzzles_count(self, count: Optional[int]) -> None:
+        self.custom_puzzles_count = count
+        label = self.main_window.custom_puzzles_settings.puzzle_count_label
+        if count is None:
+            label.clear()
+        elif count == 0:
+            label.setText('No puzzles match these settings')
+        else:
+            label.setText(f'Matching puzzles: {count}')
+
+    def initialize_custom_puzzles_window(self) -> None:
+        min_rating, max_rating, theme, player_color, num_player_moves = (
+            self.get_custom_puzzles_filters()
+        )
 
         if min_rating > max_rating:
             self.show_popup_window(
@@ -165,11 +236,18 @@ class UIController:
                 'The minimum rating must be less than the maximum rating'
             )
             return
+
+        if self.custom_puzzles_count == 0:
+            self.show_popup_window(
+                'info', 'No puzzles found',
+                'No puzzles match the selected settings'
+            )
+            return
         
-        theme = custom_puzzles_settings.theme_value.currentText()
-        theme = None if theme == '--all--' else self.parse_theme(theme)
         board_controller = self.main_window.puzzles_window.board_widget.board_controller
-        board_controller.set_puzzle_filters(min_rating, max_rating, theme)
+        board_controller.set_puzzle_filters(
+            min_rating, max_rating, theme, player_color, num_player_moves
+        )
         self.show_puzzles_window()
 
     def reset_custom_puzzles_settings(self) -> None:
@@ -179,6 +257,8 @@ class UIController:
         custom_puzzles_settings.min_rating_value.setValue(min_rating)
         custom_puzzles_settings.max_rating_value.setValue(max_rating)
         custom_puzzles_settings.theme_value.setCurrentIndex(0)
+        custom_puzzles_settings.player_color_value.setCurrentIndex(0)
+        custom_puzzles_settings.solution_length_value.setCurrentIndex(0)
 
     def show_hint(self) -> None:
         puzzles_window = self.main_window.puzzles_window
@@ -189,6 +269,9 @@ class UIController:
     def initialize_puzzle(self) -> None:
         puzzles_window = self.main_window.puzzles_window
         puzzles_window.board_widget.initialize_puzzle()
+
+    def show_puzzle_info(self) -> None:
+        puzzles_window = self.main_window.puzzles_window
         puzzle_rating, puzzle_themes = (
             puzzles_window.board_widget.get_current_puzzle_info()
         )
@@ -219,18 +302,21 @@ class UIController:
 
         if status == 0:
             status_text = 'Make a move!'
+            self.show_puzzle_info()
         elif status == 1:
             status_text = 'Correct move!'
         elif status == 2:
             status_text = 'Incorrect move - Try again'
         elif status == 3:
             status_text = 'Puzzle solved!'
-            self.user_data_manager.update_user_puzzle_statistics(
+            self.data_access.submit(
+                self.user_data_manager.record_puzzle_result,
                 self.current_user_id, puzzle_themes, False
             )
         elif status == 4:
             status_text = 'Puzzle solved on the first try!'
-            self.user_data_manager.update_user_puzzle_statistics(
+            self.data_access.submit(
+                self.user_data_manager.record_puzzle_result,
                 self.current_user_id, puzzle_themes, True
             )
         elif status == -1:
@@ -259,15 +345,36 @@ class UIController:
         puzzles_window.board_widget.board_controller.clear_puzzle_filters()
 
     def initialize_statistics(self) -> None:
-        statistics_window = self.main_window.statistics_window
+        self.data_access.submit(
+            self.load_statistics, self.current_user_id,
+            callback=self.show_statistics
+        )
+
+    def load_statistics(
+        self, user_id: int
+    ) -> Tuple[
+        Optional[UserPuzzleStatistics],
+        Tuple[List[ThemeStatistics], List[ThemeStatistics], List[ThemeStatistics]]
+    ]:
         user_puzzle_statistics = (
-            self.user_data_manager
-            .get_user_puzzle_statistics(self.current_user_id)
+            self.user_data_manager.get_user_puzzle_statistics(user_id)
         )
         user_theme_statistics = (
-            self.user_data_manager
-            .get_user_theme_statistics(self.current_user_id)
+            self.user_data_manager.get_user_theme_statistics(user_id)
         )
+        return user_puzzle_statistics, user_theme_statistics
+
+    def show_statistics(
+        self,
+        statistics: Optional[Tuple[
+            Optional[UserPuzzleStatistics],
+            Tuple[List[ThemeStatistics], List[ThemeStatistics], List[ThemeStatistics]]
+        ]]
+    ) -> None:
+        if statistics is None:
+            return
+        statistics_window = self.main_window.statistics_window
+        user_puzzle_statistics, user_theme_statistics = statistics
         most_popular, best_percentage, worst_percentage = user_theme_statistics
 
         statistics_window.puzzles_played_value.setText(
@@ -285,21 +392,21 @@ class UIController:
             )
             statistics_window.percent_solved_value.setText(f'{percent_solved:.2f}%')
 
-        if most_popular is None:
+        if not most_popular:
             statistics_window.most_popular_value.setText('-')
             statistics_window.best_percentage_value.setText('-')
             statistics_window.worst_percentage_value.setText('-')
         else:
             most_popular_text = '\n'.join(
-                f'» {self.parse_db_themes(row[0].theme)} ({row[0].puzzles_played} played)'
+                f'» {self.parse_db_themes(row[0])} ({row[1]} played)'
                 for row in most_popular
             )
             best_percentage_text = '\n'.join(
-                f'» {self.parse_db_themes(row[0].theme)} ({row[1] * 100:.2f}%)'
+                f'» {self.parse_db_themes(row[0])} ({row[2] * 100:.2f}%)'
                 for row in best_percentage
             )
             worst_percentage_text = '\n'.join(
-                f'» {self.parse_db_themes(row[0].theme)} ({row[1] * 100:.2f}%)'
+                f'» {self.parse_db_themes(row[0])} ({row[2] * 100:.2f}%)'
                 for row in worst_percentage
             )
             statistics_window.most_popular_value.setText(most_popular_text)
@@ -311,9 +418,21 @@ class UIController:
             'question', 'Reset progress', 'Are you sure you want to reset your progress?'
         )
         if confirmation == QMessageBox.StandardButton.Yes:
-            self.user_data_manager.reset_user_progress(self.current_user_id)
-            self.initialize_statistics()
-            self.show_popup_window('info', 'Reset successful', 'Your progress has been reset!')
+            self.data_access.submit(
+                self.user_data_manager.reset_user_progress, self.current_user_id,
+                callback=self.finish_reset_progress
+            )
+
+    def finish_reset_progress(self, result: None) -> None:
+        self.initialize_statistics()
+        self.show_popup_window('info', 'Reset successful', 'Your progress has been reset!')
+
+    def flush_statistics(self) -> None:
+        self.data_access.submit(self.user_data_manager.flush_statistics)
+
+    def shutdown(self) -> None:
+        self.statistics_flush_timer.stop()
+        self.data_access.submit(self.user_data_manager.close)
 
     def show_popup_window(self, type: str, title:str, text: str) -> int:
         msg_box = QMessageBox()